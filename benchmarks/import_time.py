@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+
+
+# Modules which must only be imported when a figure is made or a batch rendered
+deferred = ['matplotlib.pyplot','matplotlib.pylab','mpl_toolkits.mplot3d','multiprocessing.shared_memory','concurrent.futures.process']
+
+# Time a single import in a fresh interpreter and report modules loaded
+probe = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'time': elapsed, 'loaded': [m for m in {deferred} if m in sys.modules]}}))
+"""
+
+
+def time_import(module,repeats):
+    """Best time to import module in fresh interpreter over repeats, and any deferred modules it loaded."""
+
+    best = None
+    for i in range(repeats):
+        output = subprocess.run([sys.executable,'-c',probe.format(module=module,deferred=deferred)],
+                                check=True,capture_output=True,text=True).stdout
+        result = json.loads(output)
+        if best is None or result['time'] < best['time']:
+            best = result
+    return best
+
+
+def check_import(budget=0.2,repeats=5):
+    """
+    Check import of package stays within budget.
+
+    Budget is time in seconds allowed on top of importing matplotlib itself, so the check is independent
+    of machine speed. Fails if pyplot, pylab, mplot3d or process pools are imported eagerly.
+    """
+
+    baseline = time_import('matplotlib',repeats)
+    package = time_import('mpl_scipub',repeats)
+    overhead = package['time']-baseline['time']
+    print("matplotlib: {:.3f} s".format(baseline['time']))
+    print("mpl_scipub: {:.3f} s (overhead {:.3f} s, budget {:.3f} s)".format(package['time'],overhead,budget))
+    passed = True
+    if package['loaded']:
+        print("FAIL: eagerly imported {}".format(", ".join(package['loaded'])))
+        passed = False
+    if overhead > budget:
+        print("FAIL: import overhead exceeds budget")
+        passed = False
+    return passed
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Check import time of mpl_scipub")
+    parser.add_argument('--budget',type=float,default=0.2,help="seconds allowed on top of importing matplotlib")
+    parser.add_argument('--repeats',type=int,default=5,help="number of imports to take best time from")
+    args = parser.parse_args()
+    sys.exit(0 if check_import(budget=args.budget,repeats=args.repeats) else 1)
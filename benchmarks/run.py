@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+
+##### Benchmark cases #####
+
+# Plot types with dimensions of plot they are drawn in
+plot_types = {
+    'line': 2,
+    'lines': 2,
+    'scatter': 2,
+    'density': 2,
+    'error_bar': 2,
+    'error_shade': 2,
+    'bar': 2,
+    'heat': 2,
+    'contour': 2,
+    'tricontour': 2,
+    'line_3d': 3,
+    'scatter_3d': 3,
+    'surface_mesh': 3,
+    'surface_points': 3,
+}
+default_sizes = [1000,10000,100000,1000000,10000000]
+default_formats = ['png','pdf']
+
+
+def make_data(plot_type,n):
+    """Data and DataSet options for plot type with approximately n points."""
+
+    rng = np.random.default_rng(0)
+    if plot_type in ('heat','contour','surface_mesh'):
+        side = max(int(np.sqrt(n)),2)
+        x,y = np.meshgrid(np.linspace(-5,5,side),np.linspace(-5,5,side))
+        z = np.cos(x**2+y**2)*np.exp(-(x**2+y**2)/10)
+        return [x,y,z],{}
+    if plot_type in ('scatter','density'):
+        return rng.normal(size=(n,2)),{}
+    if plot_type == 'bar':
+        data = np.zeros((n,2))
+        data[:,0] = np.arange(n)
+        data[:,1] = rng.uniform(0,10,n)
+        return data,{}
+    if plot_type == 'scatter_3d':
+        return rng.normal(size=(n,3)),{}
+    if plot_type in ('surface_points','tricontour'):
+        data = rng.uniform(-5,5,size=(n,3))
+        data[:,2] = np.cos(data[:,0]**2+data[:,1]**2)*np.exp(-(data[:,0]**2+data[:,1]**2)/10)
+        return data,{}
+    if plot_type == 'lines':
+        # Series of 1000 points sharing x
+        x = np.linspace(0,10,1000)
+        y = np.sin(x+rng.uniform(0,2*np.pi,(max(n//1000,1),1)))
+        return [np.broadcast_to(x,y.shape),y],{}
+    if plot_type == 'line_3d':
+        t = np.linspace(0,30,n)
+        return np.column_stack((16*np.sin(t)**3,13*np.cos(t)-5*np.cos(2*t),t)),{}
+    data = np.zeros((n,2))
+    data[:,0] = np.linspace(0,10,n)
+    data[:,1] = np.sin(data[:,0])+rng.normal(0,0.1,n)
+    if plot_type in ('error_bar','error_shade'):
+        return data,{'error_y':np.full(n,0.1)}
+    return data,{}
+
+
+def run_case(plot_type,n,fmt):
+    """Time each stage of making and saving one plot, in this process."""
+
+    import matplotlib
+    matplotlib.use('Agg')
+    from mpl_scipub import DataSet, Plot
+    # Imported before timing, as the package defers them to the first figure, so stages measure plotting alone
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    if plot_types[plot_type] == 3:
+        import mpl_toolkits.mplot3d
+
+    data,kwargs = make_data(plot_type,n)
+    result = {}
+    start = time.perf_counter()
+    dataset = DataSet(data,plot=plot_type.replace('_3d',''),**kwargs)
+    result['dataset'] = time.perf_counter()-start
+    plot = Plot(dim=plot_types[plot_type])
+    plot.add_dataset(dataset)
+    start = time.perf_counter()
+    plot.plot()
+    result['plot'] = time.perf_counter()-start
+    start = time.perf_counter()
+    plot.finalise_plot()
+    result['finalise'] = time.perf_counter()-start
+    with tempfile.TemporaryDirectory() as directory:
+        name = os.path.join(directory,'benchmark')
+        start = time.perf_counter()
+        plot.save(name=name,fmt=fmt)
+        result['save'] = time.perf_counter()-start
+        result['file_size'] = os.path.getsize(name+"."+fmt)
+    result['total'] = result['dataset']+result['plot']+result['finalise']+result['save']
+    # Peak resident memory, reported in kB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result['peak_rss_mb'] = peak/1024**2 if sys.platform == 'darwin' else peak/1024
+    return result
+
+
+def run_isolated(plot_type,n,fmt,timeout):
+    """Run case in fresh interpreter so peak memory belongs to that case alone."""
+
+    command = [sys.executable,os.path.abspath(__file__),'--case','{}:{}:{}'.format(plot_type,n,fmt)]
+    try:
+        output = subprocess.run(command,capture_output=True,text=True,timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error':'timeout after {} s'.format(timeout)}
+    if output.returncode != 0:
+        return {'error':output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'failed'}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+##### Comparison with baseline #####
+
+def compare(results,baseline,tolerance):
+    """Cases slower, larger in memory or larger in output than baseline by more than tolerance."""
+
+    regressions = []
+    for key,result in results.items():
+        reference = baseline.get(key)
+        if reference is None or 'error' in reference:
+            continue
+        if 'error' in result:
+            regressions.append('{}: {}'.format(key,result['error']))
+            continue
+        for metric in ('total','peak_rss_mb','file_size'):
+            if result[metric] > reference[metric]*(1+tolerance):
+                regressions.append('{}: {} {:.4g} > baseline {:.4g}'.format(key,metric,result[metric],reference[metric]))
+    return regressions
+
+
+def print_result(key,result):
+    """Print one line of results table."""
+
+    if 'error' in result:
+        print('{:<32} {}'.format(key,result['error']))
+    else:
+        print('{:<32} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.1f} {:>11d}'.format(
+            key,result['dataset'],result['plot'],result['finalise'],result['save'],result['total'],
+            result['peak_rss_mb'],result['file_size']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark DataSet construction, plotting, finalising and saving")
+    parser.add_argument('--types',nargs='+',default=list(plot_types),choices=list(plot_types),help="plot types")
+    parser.add_argument('--sizes',nargs='+',type=float,default=default_sizes,help="numbers of points")
+    parser.add_argument('--formats',nargs='+',default=default_formats,help="output formats")
+    parser.add_argument('--timeout',type=float,default=600,help="seconds allowed for each case")
+    parser.add_argument('--output',default=None,help="write results to JSON file")
+    parser.add_argument('--baseline',default=None,help="compare results with baseline JSON file")
+    parser.add_argument('--save-baseline',action='store_true',help="write results to baseline file instead of comparing")
+    parser.add_argument('--tolerance',type=float,default=0.25,help="fractional increase allowed over baseline")
+    parser.add_argument('--case',default=None,help=argparse.SUPPRESS) # Single case, run in subprocess
+    args = parser.parse_args()
+
+    if args.case is not None:
+        plot_type,n,fmt = args.case.split(':')
+        print(json.dumps(run_case(plot_type,int(n),fmt)))
+        sys.exit(0)
+
+    print('{:<32} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9} {:>11}'.format(
+        'case','dataset/s','plot/s','final/s','save/s','total/s','rss/MB','file/B'))
+    results = {}
+    for plot_type in args.types:
+        for n in args.sizes:
+            for fmt in args.formats:
+                key = '{}-{}-{}'.format(plot_type,int(n),fmt)
+                results[key] = run_isolated(plot_type,int(n),fmt,args.timeout)
+                print_result(key,results[key])
+
+    results = {'matplotlib':__import__('matplotlib').__version__,'numpy':np.__version__,'cases':results}
+    if args.output is not None:
+        with open(args.output,'w') as f:
+            json.dump(results,f,indent=2)
+    if args.baseline is not None:
+        if args.save_baseline:
+            with open(args.baseline,'w') as f:
+                json.dump(results,f,indent=2)
+        else:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            regressions = compare(results['cases'],baseline['cases'],args.tolerance)
+            for regression in regressions:
+                print('REGRESSION {}'.format(regression))
+            sys.exit(1 if regressions else 0)
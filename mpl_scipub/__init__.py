@@ -1,2 +1,10 @@
 from .plotter import Plot
-from .dataset import DataSet
\ No newline at end of file
+from .dataset import DataSet, CompactDataSet
+
+
+def __getattr__(name):
+    # Batch rendering imported when first used, as it loads multiprocessing and process pools
+    if name == 'render_batch':
+        from .batch import render_batch
+        return render_batch
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__,name))
@@ -0,0 +1,142 @@
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import matplotlib as mpl
+from .dataset import ColumnData, instance_attributes
+from .saving import output_formats
+
+
+# Shared memory blocks attached in this worker process, by name
+attached = {}
+
+
+def attach(name,shape,dtype):
+    """Array view of shared memory block, attaching block once per worker."""
+
+    if name not in attached:
+        attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape,dtype=dtype,buffer=attached[name].buf)
+
+
+class SharedArray:
+    """Copy of array in shared memory, pickled as a reference to the block rather than its contents."""
+
+    def __init__(self,array):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.memory = shared_memory.SharedMemory(create=True,size=max(array.nbytes,1))
+        np.ndarray(self.shape,dtype=self.dtype,buffer=self.memory.buf)[...] = array
+
+
+    def __reduce__(self):
+        return attach,(self.memory.name,self.shape,self.dtype.str)
+
+
+    def release(self):
+        """Free shared memory block."""
+
+        self.memory.close()
+        self.memory.unlink()
+
+
+def share(value,shared,threshold):
+    """Replace large arrays in value with shared memory copies, reusing copies of arrays seen before."""
+
+    if isinstance(value,np.ndarray) and value.dtype != object and value.nbytes >= threshold:
+        key = id(value)
+        if key not in shared:
+            shared[key] = (value,SharedArray(value)) # Keep array alive so id is not reused
+        return shared[key][1]
+    if isinstance(value,ColumnData):
+        return ColumnData([share(c,shared,threshold) for c in value.columns])
+    if isinstance(value,tuple):
+        return tuple(share(v,shared,threshold) for v in value)
+    if isinstance(value,list):
+        return [share(v,shared,threshold) for v in value]
+    return value
+
+
+def plot_spec(plot,shared,threshold):
+    """Copy of plot without figure, with data sets referring to shared arrays."""
+
+    spec = copy.copy(plot)
+    for attr in ('fig','ax'):
+        spec.__dict__.pop(attr,None)
+    spec.initialised = False
+    spec.finalised = False
+    spec.bar_cache = {}
+    spec.bar_cache_count = 0
+    spec.datasets = []
+    for dataset in plot.datasets:
+        dataset_spec = copy.copy(dataset)
+        for attr,value in instance_attributes(dataset).items():
+            setattr(dataset_spec,attr,share(value,shared,threshold))
+        spec.datasets.append(dataset_spec)
+    return spec
+
+
+def initialise_worker(params):
+    """Use non-interactive backend and parent's rc parameters in worker processes."""
+
+    mpl.use('Agg')
+    mpl.rcParams.update(params)
+
+
+def render(plot,name,fmt,dpi_quality):
+    """Plot and save in worker process, returning filename, or list of filenames if fmt is a list."""
+
+    plot.set_figure_pool() # Reuse figures between tasks in this worker
+    try:
+        plot.plot()
+        plot.save(name=name,fmt=fmt,dpi_quality=dpi_quality)
+    finally:
+        plot.close()
+    filenames = [name+"."+f for f,dpi in output_formats(fmt,dpi_quality)]
+    return filenames[0] if isinstance(fmt,str) else filenames
+
+
+def render_batch(plots,names=None,fmt="pdf",dpi_quality=None,workers=None,share_threshold=1048576):
+    """
+    Plot and save many Plot objects in parallel worker processes.
+
+    Arrays larger than share_threshold are placed in shared memory once and read by workers in place,
+    rather than pickled with every figure.
+    Results are returned in the order of plots, as the saved filename, list of filenames if fmt is a list, or the exception raised by that figure.
+
+    :param plots: Plot objects with data sets added
+    :type plots: list
+    :param names: output name for each plot, defaults to plot_0, plot_1 etc.
+    :type names: list
+    :param fmt: output format or list of formats
+    :type fmt: str or list
+    :param dpi_quality: output resolution, defaults to that set for each plot
+    :type dpi_quality: int
+    :param workers: number of worker processes, defaults to number of cpus
+    :type workers: int
+    :param share_threshold: size in bytes above which arrays are passed through shared memory
+    :type share_threshold: int
+    """
+
+    if names is None:
+        names = ["plot_{}".format(i) for i in range(len(plots))]
+    shared = {}
+    results = []
+    try:
+        specs = [plot_spec(plot,shared,share_threshold) for plot in plots]
+        params = {key:value for key,value in mpl.rcParams.items() if key != 'backend'}
+        context = multiprocessing.get_context('spawn') # Fresh workers, unaffected by parent's pyplot state
+        with ProcessPoolExecutor(max_workers=workers,mp_context=context,initializer=initialise_worker,
+                                 initargs=(params,)) as executor:
+            futures = [executor.submit(render,spec,name,fmt,dpi_quality) for spec,name in zip(specs,names)]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    results.append(error)
+    finally:
+        for array,shared_array in shared.values():
+            shared_array.release()
+    return results
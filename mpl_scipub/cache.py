@@ -0,0 +1,163 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy as np
+import matplotlib as mpl
+from matplotlib.colors import Colormap, Normalize
+from .dataset import ColumnData, instance_attributes
+
+
+# Plot and DataSet attributes holding figures, caches or other state which do not change the output
+runtime_attributes = ('fig','ax','artists','animated','drawn_points','background','figure_pool','render_cache',
+                      'bar_cache','bar_cache_count','initialised','finalised','tick_spacing','save_report',
+                      'buffer','stats','levels','triangulation','triangulation_dir','pyramid_dir')
+
+
+def hash_value(digest,value,chunk=1048576):
+    """
+    Add value to hash, descending into containers and objects of this package.
+    Other objects without a stable description hash by their repr, which usually includes their address,
+    so never match.
+    """
+
+    if isinstance(value,np.ndarray):
+        digest.update('array{}{}'.format(value.dtype.str,value.shape).encode())
+        # Chunks of whole rows, so broadcast or strided arrays are not copied in full
+        rows = max(1,chunk//max(int(np.prod(value.shape[1:])),1))
+        for start in range(0,len(value) if value.ndim else 1,rows):
+            digest.update(np.ascontiguousarray(value[start:start+rows] if value.ndim else value).data)
+    elif isinstance(value,ColumnData):
+        digest.update(b'columns')
+        hash_value(digest,value.columns)
+    elif isinstance(value,dict):
+        digest.update('dict{}'.format(len(value)).encode())
+        for key in sorted(value,key=str):
+            hash_value(digest,key)
+            hash_value(digest,value[key])
+    elif isinstance(value,(list,tuple)):
+        digest.update('{}{}'.format(type(value).__name__,len(value)).encode())
+        for v in value:
+            hash_value(digest,v)
+    elif isinstance(value,Normalize):
+        digest.update('{}{}'.format(type(value).__name__,(value.vmin,value.vmax,value.clip)).encode())
+    elif isinstance(value,Colormap):
+        digest.update('{}{}{}'.format(type(value).__name__,value.name,value.N).encode())
+    elif value is None or isinstance(value,(str,bytes,bool,int,float,complex,np.generic)):
+        digest.update('{}{!r}'.format(type(value).__name__,value).encode())
+    elif type(value).__module__.startswith('mpl_scipub'):
+        digest.update(type(value).__name__.encode())
+        hash_value(digest,{k:v for k,v in instance_attributes(value).items() if k not in runtime_attributes})
+    else:
+        digest.update(repr(value).encode())
+
+
+def plot_key(plot):
+    """Hash of everything affecting a plot's output: data sets, plot settings, rc parameters and versions."""
+
+    digest = hashlib.blake2b(digest_size=20)
+    hash_value(digest,mpl.__version__)
+    hash_value(digest,np.__version__)
+    hash_value(digest,{key:value for key,value in mpl.rcParams.items() if key != 'backend'})
+    hash_value(digest,plot)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Saved figures kept on disk by hash of everything affecting the output,
+    so figures whose data and settings are unchanged are copied from the cache rather than drawn.
+    The least recently used files are removed when the cache exceeds its size.
+
+    Changes made directly to a plot's matplotlib figure or axes are not part of the hash.
+    """
+
+    def __init__(self,directory,max_size=1073741824,link=False):
+        """
+        :param directory: directory holding cached files, created if needed
+        :type directory: str
+        :param max_size: maximum total size of cached files in bytes
+        :type max_size: int
+        :param link: hard link outputs to cached files rather than copying, outputs must then not be edited in place
+        :type link: bool
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+        self.link = link
+        os.makedirs(directory,exist_ok=True)
+
+
+    def filename(self,key,fmt,dpi):
+        """Cached file for plot hash, format and resolution."""
+
+        digest = hashlib.blake2b('{}{}{}'.format(key,fmt,dpi).encode(),digest_size=20)
+        return os.path.join(self.directory,digest.hexdigest()+"."+fmt)
+
+
+    def fetch(self,key,name,formats):
+        """Write name.fmt for each (format,dpi) from cache, returning False without writing if any is missing."""
+
+        cached = [self.filename(key,fmt,dpi) for fmt,dpi in formats]
+        if not all(os.path.exists(c) for c in cached):
+            return False
+        for c,(fmt,dpi) in zip(cached,formats):
+            target = name+"."+fmt
+            try:
+                self.place(c,target)
+            except FileNotFoundError:
+                return False # Evicted by another process
+            os.utime(c) # Mark as recently used
+        return True
+
+
+    def place(self,cached,target):
+        """Link or copy cached file to target."""
+
+        if self.link:
+            if os.path.lexists(target):
+                os.remove(target)
+            try:
+                os.link(cached,target)
+                return
+            except OSError:
+                pass # Different file systems
+        shutil.copyfile(cached,target)
+
+
+    def store(self,key,name,formats):
+        """Copy written name.fmt for each (format,dpi) into cache, then evict old files."""
+
+        for fmt,dpi in formats:
+            handle,temporary = tempfile.mkstemp(dir=self.directory,suffix='.tmp')
+            os.close(handle)
+            shutil.copyfile(name+"."+fmt,temporary)
+            os.replace(temporary,self.filename(key,fmt,dpi)) # Atomic, so readers never see partial files
+        self.evict()
+
+
+    def evict(self):
+        """Remove least recently used files until cache is within size."""
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime,stat.st_size,entry.path))
+        total = sum(e[1] for e in entries)
+        for mtime,size,path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+    def clear(self):
+        """Remove all cached files."""
+
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                os.remove(entry.path)
@@ -0,0 +1,122 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib as mpl
+from .spec import read_spec, data_references, spec_output, render_spec
+
+
+def warm_worker():
+    """Import plotting modules once per worker, so each figure pays only for drawing."""
+
+    mpl.use('Agg')
+    import matplotlib.pyplot
+    import mpl_toolkits.mplot3d
+
+
+def spec_signature(filename):
+    """
+    Hash of spec file contents, size and modification time of its data files and library versions,
+    which changes whenever the figure needs rendering again.
+    """
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filename,'rb') as f:
+        digest.update(f.read())
+    spec = read_spec(filename)
+    directory = os.path.dirname(filename)
+    for reference in data_references(spec):
+        path = os.path.join(directory,reference['path'])
+        stat = os.stat(path)
+        digest.update('{}{}{}'.format(path,stat.st_size,stat.st_mtime_ns).encode())
+    digest.update(mpl.__version__.encode())
+    return digest.hexdigest(),spec
+
+
+def read_state(filename):
+    """Signatures of specs rendered previously."""
+
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
+
+def write_state(filename,state):
+    """Write signatures of rendered specs, replacing file atomically."""
+
+    temporary = filename+'.tmp'
+    with open(temporary,'w') as f:
+        json.dump(state,f,indent=1,sort_keys=True)
+    os.replace(temporary,filename)
+
+
+def outputs_exist(spec,filename):
+    """Whether all output files of spec exist."""
+
+    name = spec_output(spec,filename)
+    fmt = spec.get('format','pdf')
+    formats = [fmt] if isinstance(fmt,str) else [f if isinstance(f,str) else f[0] for f in fmt]
+    return all(os.path.exists(name+"."+f) for f in formats)
+
+
+def render(args):
+    """Render specs whose spec, data or outputs changed since the last run, returning exit status."""
+
+    state = read_state(args.state)
+    pending = {}
+    current = 0
+    status = 0
+    for filename in args.specs:
+        key = os.path.abspath(filename)
+        try:
+            signature,spec = spec_signature(filename)
+        except Exception as error:
+            print("{}: {}".format(filename,error),file=sys.stderr)
+            status = 1
+            continue
+        if not args.force and state.get(key) == signature and outputs_exist(spec,filename):
+            current += 1
+            continue
+        pending[filename] = signature
+    if not pending:
+        print("{} figures up to date".format(current))
+        return status
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(args.jobs,len(pending)),mp_context=context,initializer=warm_worker) as executor:
+        futures = {executor.submit(render_spec,filename):filename for filename in pending}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                outputs = future.result()
+            except Exception as error:
+                print("{}: {}".format(filename,error),file=sys.stderr)
+                status = 1
+                continue
+            state[os.path.abspath(filename)] = pending[filename]
+            print(" ".join(outputs))
+    write_state(args.state,state)
+    return status
+
+
+def main(argv=None):
+    """Command line interface, e.g. mpl-scipub render specs/*.json -j 16"""
+
+    parser = argparse.ArgumentParser(prog='mpl-scipub',description="Render figures from spec files")
+    commands = parser.add_subparsers(dest='command',required=True)
+    parser_render = commands.add_parser('render',help="render JSON or TOML figure specs")
+    parser_render.add_argument('specs',nargs='+',help="spec files")
+    parser_render.add_argument('-j','--jobs',type=int,default=os.cpu_count() or 1,help="number of worker processes")
+    parser_render.add_argument('--force',action='store_true',help="render all specs, even if unchanged")
+    parser_render.add_argument('--state',default='.mpl_scipub_state.json',
+                               help="file recording specs rendered, to skip unchanged figures")
+    args = parser.parse_args(argv)
+    if args.command == 'render':
+        return render(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
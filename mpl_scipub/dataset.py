@@ -1,7 +1,105 @@
+import os
 import numpy as np
 import matplotlib as mpl
-import matplotlib.pyplot as plt
 from matplotlib.colors import Normalize
+from matplotlib.markers import MarkerStyle
+from .profiling import profiled
+from .reduction import column_statistics, build_pyramid
+from .triangulation import point_key, triangulation_cache
+from .loaders import read_text_columns, read_npz, read_hdf5, grid_from_columns
+
+
+def get_colour_map(name):
+    """Colour map by name, without importing pyplot."""
+
+    try:
+        return mpl.colormaps[name]
+    except AttributeError: # Registry added in matplotlib 3.5
+        return mpl.cm.get_cmap(name)
+
+
+class ColumnData:
+    """
+    Separate column arrays indexed like a single (n_points,n_columns) array, without copying columns.
+    """
+
+    def __init__(self,columns):
+        """Columns as sequence of 1D arrays of equal length."""
+
+        self.columns = tuple(columns)
+        self.shape = (self.columns[0].shape[0],len(self.columns))
+        self.ndim = 2
+        self.dtype = np.result_type(*self.columns)
+
+
+    def __len__(self):
+        return self.shape[0]
+
+
+    def __getitem__(self,key):
+        # Column access such as data[:,0] returns view of original column
+        if isinstance(key,tuple) and len(key) == 2 and isinstance(key[1],(int,np.integer)):
+            return self.columns[key[1]][key[0]]
+        # Row access
+        if isinstance(key,(int,np.integer)):
+            return np.array([c[key] for c in self.columns])
+        return np.column_stack(self.columns)[key]
+
+
+    def __setitem__(self,key,value):
+        if isinstance(key,tuple) and len(key) == 2 and isinstance(key[1],(int,np.integer)):
+            self.columns[key[1]][key[0]] = value
+        else:
+            raise IndexError("Column data can only be assigned by column")
+
+
+    def __array__(self,dtype=None,copy=None):
+        data = np.column_stack(self.columns)
+        if dtype is not None:
+            data = data.astype(dtype,copy=False)
+        return data
+
+
+def convert(array,dtype,copy=None):
+    """
+    Array as dtype, unchanged if dtype is None or array already of that type.
+    Broadcast views, such as meshes from np.meshgrid(copy=False), are converted without expanding repeated values.
+
+    :param copy: raise ValueError if conversion needed and copy is False
+    :type copy: bool
+    """
+
+    if dtype is None or array.dtype == dtype:
+        return array
+    if copy is False:
+        raise ValueError("Data cannot be converted to {} without copying".format(np.dtype(dtype)))
+    if array.size > 0 and 0 in array.strides:
+        base = array[tuple(slice(None) if stride else slice(0,1) for stride in array.strides)]
+        return np.broadcast_to(np.array(base,dtype=dtype),array.shape)
+    return np.array(array,dtype=dtype)
+
+
+def stack_columns(columns,dtype=None):
+    """(n_points,n_columns) array from 1D column arrays, converting each column to dtype as it is copied."""
+
+    data = np.empty((len(columns[0]),len(columns)),dtype=np.result_type(*columns) if dtype is None else dtype)
+    for i,column in enumerate(columns):
+        data[:,i] = column
+    return data
+
+
+def instance_attributes(value):
+    """Attributes set on object, from its slots and dictionary."""
+
+    attributes = {}
+    for cls in type(value).__mro__:
+        for name in cls.__dict__.get('__slots__',()):
+            try:
+                attributes[name] = object.__getattribute__(value,name) # Skips __getattr__ defaults
+            except AttributeError:
+                pass # Slot not set
+    attributes.update(getattr(value,'__dict__',{}))
+    return attributes
 
 
 class DataSet:
@@ -9,19 +107,24 @@ class DataSet:
     Holds data set and associated plot options. 
     """
 
-    # Static variables to set different automatic styles for colours, markers etc.
-    auto_id = 0
-    auto_markers = mpl.markers.MarkerStyle().filled_markers
-    auto_colours = plt.cm.get_cmap('Set1')
+    # Automatic styles for colours, markers etc., chosen by position of data set in its plot
+    auto_markers = MarkerStyle.filled_markers
+    auto_colours = get_colour_map('Set1')
 
 
+    @profiled('dataset',lambda self,data,**kwargs: {'plot_type':kwargs.get('plot','line')})
     def __init__(self,data,**kwargs):
         """
         Data as numpy array. Format depends on plot type but usually (n_points,2) for 2D plot and (n_points,3) for 3D plot.
         Can specifiy plot options through kwargs now, or later through setters.
+        Data can also be given as a list of 1D column arrays, a list of [x,y,z] meshes or the path to a .npy file.
         
         :param data: x,y,(z) data
-        :type data: np.ndarray
+        :type data: np.ndarray, list or str
+        :param copy: copy data (True), copy only if conversion needed (None) or never copy (False)
+        :type copy: bool
+        :param dtype: type to store values as, e.g. np.float32 to halve memory, defaults to type of data
+        :type dtype: np.dtype
         :param error_y: symmetric errors in given direction
         :type error_y: np.ndarray with n_points
         :param error_width: width of error bars 
@@ -30,8 +133,10 @@ class DataSet:
         :type error_interval: int
         :param error_cap: error cap size 
         :type error_cap: int 
-        :param plot: type of plot (line, scatter, bar ,error_bar, error_shade, heat, contour)
+        :param plot: type of plot (line, lines, scatter, density, bar ,error_bar, error_shade, heat, contour, tricontour)
         :type plot: str
+        :param offsets: index of first point of each series in columns of several series drawn as lines
+        :type offsets: np.ndarray
         :param label: data label for legend
         :type label: str
         :param order: ordering of overlaid datasets, higher number on top
@@ -46,13 +151,15 @@ class DataSet:
         :type marker_size: float or np.ndarray
         :param bar_width: width of each bar in bar graph
         :type bar_width: float
+        :param bar_collection: draw bars as single collection, by default when number of bars is large
+        :type bar_collection: bool
         :param contour_levels: specified levels to draw contours
         :type contour_levels: np.ndarray
         :param contour_number: number of contours to draw if levels not supplied
         :type contour_number: int
         :param contour_limits: lower and upper bounds for contours
         :type contour_limits: tuple
-        :param colour: colour code for all data points or array of floats if using colour map
+        :param colour: colour code for all data points or array of floats if using colour map (one per series for lines)
         :type colour: str or np.ndarray
         :param colour_map: colour map 
         :type colour_map: str 
@@ -60,18 +167,41 @@ class DataSet:
         :type colour_norm: tuple
         :param surface_interpolation: interpolation type for surface plots
         :type surface_interpolation: str
+        :param surface_resolution: rows and columns of polygons in 3D surfaces, defaults to suit output size
+        :type surface_resolution: int or tuple
+        :param downsample: reduce points drawn in line graphs to the output resolution ('minmax' or 'lttb')
+        :type downsample: str
+        :param downsample_points: number of pixel columns to downsample to, defaults to plot width in pixels
+        :type downsample_points: int
+        :param aggregate: quantity shown in density plot (count, or mean or max of colour array)
+        :type aggregate: str
+        :param density_bins: number of grid cells in x and y for density plot, defaults to plot size in pixels
+        :type density_bins: tuple
+        :param triangulation_dir: directory to keep triangulations of points between runs
+        :type triangulation_dir: str
+        :param rasterize: draw as raster image within vector output, None to rasterize when large
+        :type rasterize: bool
+        :param pyramid: draw heat map from reduced copies of z at output resolution, combining cells by mean or max
+        :type pyramid: str
+        :param pyramid_dir: directory to write reduced copies as memory-mapped files
+        :type pyramid_dir: str
         """
 
         # Data
-        self.id = self.__class__.auto_id # Set id for default properties
-        self.data = np.array(data) # Ensure data stored as numpy array
+        self.id = 0 # Position in plot for default properties, set when added to plot
+        self.set_data(data,copy=kwargs.get('copy',True),dtype=kwargs.get('dtype',None))
+        self.auto_label = kwargs.get('label') is None
+        self.auto_order = kwargs.get('order') is None
         self.label = kwargs.get('label','data_{}'.format(self.id)) # Label for legend
-        self.zorder = kwargs.get('order',self.id) # Overlay order - default in order created
+        self.zorder = kwargs.get('order',self.id) # Overlay order - default in order added
 
         # Choose suitable default plot type or get user choice
         default_plot_type = 'line'
         self.plot_type = kwargs.get('plot',default_plot_type)
 
+        # Series
+        self.set_series(offsets=kwargs.get('offsets',None))
+
         # Errors
         self.error_x = kwargs.get('error_x',None)
         self.error_y = kwargs.get('error_y',None)
@@ -96,7 +226,8 @@ class DataSet:
 
         # Bar
         bar_width = kwargs.get('bar_width',1)
-        self.set_bar(width=bar_width)
+        bar_collection = kwargs.get('bar_collection',None)
+        self.set_bar(width=bar_width,collection=bar_collection)
 
         # Colours
         colour = kwargs.get('colour',None) # Colour or array of floats
@@ -105,7 +236,30 @@ class DataSet:
         self.set_colour(colour=colour,map=colour_map,norm=colour_norm)
 
         # Surface
-        self.surface_interpolation = kwargs.get('surface_interpolation',None)
+        surface_interpolation = kwargs.get('surface_interpolation',None)
+        surface_resolution = kwargs.get('surface_resolution',None)
+        self.set_surface(interpolation=surface_interpolation,resolution=surface_resolution)
+
+        # Density
+        aggregate = kwargs.get('aggregate','count')
+        density_bins = kwargs.get('density_bins',None)
+        self.set_density(aggregate=aggregate,bins=density_bins)
+
+        # Triangulation
+        self.set_triangulation(directory=kwargs.get('triangulation_dir',None))
+
+        # Heat map pyramid
+        pyramid = kwargs.get('pyramid',None)
+        pyramid_dir = kwargs.get('pyramid_dir',None)
+        self.set_pyramid(method=pyramid,directory=pyramid_dir)
+
+        # Downsampling
+        downsample = kwargs.get('downsample',None)
+        downsample_points = kwargs.get('downsample_points',None)
+        self.set_downsample(method=downsample,points=downsample_points)
+
+        # Rasterization in vector output
+        self.set_rasterize(rasterize=kwargs.get('rasterize',None))
 
         # Contours
         contour_levels = kwargs.get('contour_levels',None)
@@ -113,8 +267,237 @@ class DataSet:
         contour_limits = kwargs.get('contour_limits',None)
         self.set_contours(levels=contour_levels,number=contour_number,limits=contour_limits)
 
-        # Increment unique id
-        self.__class__.auto_id += 1
+
+    def set_id(self,id):
+        """Set position of data set in plot, updating automatic label, order, marker and colour."""
+
+        self.id = id
+        if self.auto_label:
+            self.label = 'data_{}'.format(id)
+        if self.auto_order:
+            self.zorder = id
+        if self.auto_marker and self.marker_style is not None:
+            self.marker_style = self.auto_markers[id%len(self.auto_markers)]
+        if self.auto_colour:
+            self.colour = self.auto_colours(id)
+
+
+    @classmethod
+    def from_csv(cls,filename,columns=None,delimiter=',',skiprows=0,dtype=np.float64,grid=False,chunk=1048576,**kwargs):
+        """
+        Data set from columns of a delimited text file, parsed in chunks and kept as separate column arrays.
+
+        :param columns: indices of x,y,(z) columns, defaults to all
+        :type columns: list
+        :param delimiter: column separator, None for any whitespace
+        :type delimiter: str
+        :param skiprows: number of header lines to skip
+        :type skiprows: int
+        :param dtype: type of values, e.g. np.float32 to halve memory
+        :type dtype: np.dtype
+        :param grid: x,y,z columns are points of a regular grid, converted to [x,y,z] meshes
+        :type grid: bool
+        :param chunk: number of lines parsed at once
+        :type chunk: int
+        """
+
+        arrays = read_text_columns(filename,columns=columns,delimiter=delimiter,skiprows=skiprows,dtype=dtype,chunk=chunk)
+        if grid:
+            return cls.from_grid(*grid_from_columns(*arrays[:3]),**kwargs)
+        kwargs.setdefault('copy',None)
+        return cls(arrays,**kwargs)
+
+
+    @classmethod
+    def from_npz(cls,filename,keys=None,dtype=None,**kwargs):
+        """
+        Data set from .npz archive, as one (n_points,n_columns) array or separate column or mesh arrays.
+
+        :param keys: names of arrays to use, defaults to all
+        :type keys: list
+        :param dtype: convert arrays to dtype
+        :type dtype: np.dtype
+        """
+
+        arrays = read_npz(filename,keys=keys,dtype=dtype)
+        kwargs.setdefault('copy',None)
+        return cls(arrays[0] if len(arrays) == 1 else arrays,**kwargs)
+
+
+    @classmethod
+    def from_hdf5(cls,filename,datasets,columns=None,dtype=None,chunk=1048576,**kwargs):
+        """
+        Data set from HDF5 file, requires h5py.
+
+        :param datasets: name of 2D dataset whose columns are read, or list of names of column or mesh datasets
+        :type datasets: str or list
+        :param columns: columns of 2D dataset to read, defaults to all
+        :type columns: list
+        :param dtype: convert arrays to dtype while reading
+        :type dtype: np.dtype
+        """
+
+        arrays = read_hdf5(filename,datasets,columns=columns,dtype=dtype,chunk=chunk)
+        kwargs.setdefault('copy',None)
+        return cls(arrays,**kwargs)
+
+
+    @classmethod
+    def from_grid(cls,x,y,z,**kwargs):
+        """
+        Data set of [x,y,z] meshes for heat, contour and surface plots from grid axes,
+        without storing x and y meshes.
+
+        :param x: x values of grid columns
+        :type x: np.ndarray with nx points
+        :param y: y values of grid rows
+        :type y: np.ndarray with ny points
+        :param z: values on grid
+        :type z: np.ndarray with shape (ny,nx)
+        """
+
+        x_mesh,y_mesh = np.meshgrid(x,y,copy=False) # Broadcast views
+        kwargs.setdefault('copy',None)
+        return cls([x_mesh,y_mesh,np.asarray(z)],**kwargs)
+
+
+    @classmethod
+    def from_series(cls,x,y,z=None,offsets=None,**kwargs):
+        """
+        Data set of many series drawn together as lines, by default with plot type lines.
+
+        Either y (and z) as (n_series,n_points) arrays with x shared by all series or given per series,
+        or x, y (and z) as concatenated series with offsets giving the first point of each series.
+
+        :param x: x values shared by series, of each series or concatenated
+        :type x: np.ndarray
+        :param y: y values of each series or concatenated
+        :type y: np.ndarray
+        :param z: z values for 3D plot
+        :type z: np.ndarray
+        :param offsets: index of first point of each series in concatenated arrays
+        :type offsets: np.ndarray
+        """
+
+        kwargs.setdefault('plot','lines')
+        kwargs.setdefault('copy',None)
+        columns = [np.asarray(x),np.asarray(y)]+([np.asarray(z)] if z is not None else [])
+        if offsets is None:
+            columns[0] = np.broadcast_to(columns[0],columns[1].shape) # Shared x as view
+        else:
+            kwargs['offsets'] = np.asarray(offsets)
+        return cls(columns,**kwargs)
+
+
+    def set_data(self,data,copy=True,dtype=None):
+        """
+        Set data, with policy for copying and type of stored values.
+
+        With copy=None arrays and memory-mapped files are used in place, separate column arrays are kept as views
+        and [x,y,z] meshes are held as a tuple rather than stacked.
+        With copy=False a ValueError is raised if the data cannot be used without copying or converting.
+        With dtype given values are converted as they are copied, e.g. np.float32 to halve memory.
+        """
+
+        self.dtype = dtype # Type of stored values, None for type of data
+        self.buffer = None # Storage for appended data
+        self.stats = {} # Cached statistics of each column
+        self.levels = None # Cached heat map pyramid
+        self.triangulation = None # Cached hash of points and their triangulation
+        # Open .npy files memory-mapped unless copy requested
+        if isinstance(data,(str,os.PathLike)):
+            data = np.load(data,mmap_mode=None if copy else 'r')
+            copy = None if copy else copy # Loaded array used in place unless conversion needed
+        if isinstance(data,np.ndarray):
+            self.data = np.array(data,dtype=dtype) if copy else convert(data,dtype,copy)
+            return
+        if isinstance(data,ColumnData):
+            if copy:
+                self.data = stack_columns(data.columns,dtype)
+            else:
+                self.data = ColumnData([convert(c,dtype,copy) for c in data.columns]) if dtype is not None else data
+            return
+        if isinstance(data,(list,tuple)) and len(data)>0 and all(isinstance(d,np.ndarray) for d in data):
+            shapes = set(d.shape for d in data)
+            # Separate columns
+            if len(shapes) == 1 and data[0].ndim == 1:
+                if copy:
+                    self.data = stack_columns(data,dtype)
+                else:
+                    self.data = ColumnData([convert(d,dtype,copy) for d in data])
+                return
+            # Meshes
+            if not copy:
+                self.data = tuple(convert(d,dtype,copy) for d in data)
+                return
+        if copy is False:
+            raise ValueError("Data cannot be used without copying")
+        self.data = np.array(data,dtype=dtype) # Ensure data stored as numpy array
+
+
+    def append(self,rows):
+        """
+        Append rows to (n_points,n_columns) data for streaming updates.
+
+        Data is held as a view of a larger buffer which doubles in size when full,
+        so the cost of repeated appends is amortised.
+        """
+
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows[np.newaxis,:]
+        n = len(self.data)
+        m = rows.shape[0]
+        if self.buffer is None or self.data.base is not self.buffer or self.buffer.shape[0] < n+m:
+            capacity = max(2*n,n+m,1024)
+            if self.buffer is not None and self.data.base is self.buffer:
+                capacity = max(capacity,2*self.buffer.shape[0])
+            dtype = np.result_type(self.data.dtype,rows.dtype) if self.dtype is None else self.dtype
+            buffer = np.empty((capacity,rows.shape[1]),dtype=dtype)
+            buffer[:n] = self.data
+            self.buffer = buffer
+        self.buffer[n:n+m] = rows
+        # Update cached statistics from new rows only
+        for i,stats in self.stats.items():
+            new = column_statistics(rows[:,i])
+            self.stats[i] = {'min':np.fmin(stats['min'],new['min']),'max':np.fmax(stats['max'],new['max']),
+                             'finite':stats['finite']+new['finite'],
+                             'monotonic':stats['monotonic'] and new['monotonic'] and (n == 0 or bool(rows[0,i]>=self.buffer[n-1,i]))}
+        self.data = self.buffer[:n+m]
+
+
+    def column(self,i):
+        """Values of x, y or z, as mesh i for [x,y,z] meshes or otherwise column i."""
+
+        if isinstance(self.data,tuple) or self.data.ndim == 3:
+            return self.data[i]
+        return self.data[:,i]
+
+
+    def statistics(self,i):
+        """
+        Minimum, maximum and number of finite values of x, y or z, and whether values never decrease (columns only).
+        Computed in one pass when first needed and kept until data changes.
+        """
+
+        if i not in self.stats:
+            grid = isinstance(self.data,tuple) or self.data.ndim == 3
+            self.stats[i] = column_statistics(self.column(i),order=not grid)
+        return self.stats[i]
+
+
+    def set_series(self,offsets=None):
+        """Set index of first point of each series in concatenated columns (None for series as rows of meshes)."""
+
+        self.offsets = offsets
+
+
+    def series_count(self):
+        """Number of series drawn as lines."""
+
+        if self.offsets is not None:
+            return len(self.offsets)
+        return len(self.column(1))
 
 
     def set_line(self,style='-',width=2):
@@ -124,20 +507,22 @@ class DataSet:
         self.line_width = width
 
 
-    def set_bar(self,width=1):
-        """Set bar width."""
+    def set_bar(self,width=1,collection=None):
+        """Set bar width and whether bars are drawn as a single collection (None for automatic)."""
 
         self.bar_width = width
+        self.bar_collection = collection
 
 
     def set_marker(self,style=None,size=10):
         """Set marker style and size."""
 
+        self.auto_marker = style is None
         if style is None:
             if isinstance(size,np.ndarray):
-                self.marker_style = self.__class__.auto_markers[self.id]
+                self.marker_style = self.auto_markers[self.id%len(self.auto_markers)]
             elif size>0:
-                self.marker_style = self.__class__.auto_markers[self.id]
+                self.marker_style = self.auto_markers[self.id%len(self.auto_markers)]
             else:
                 self.marker_style = None
         else:
@@ -153,6 +538,73 @@ class DataSet:
         self.error_cap = cap
 
 
+    def set_density(self,aggregate='count',bins=None):
+        """Set aggregation and grid size for density plot."""
+
+        if aggregate not in ('count','mean','max'):
+            print("Aggregate must be count, mean or max")
+            aggregate = 'count'
+        self.aggregate = aggregate
+        self.density_bins = bins
+
+
+    def set_surface(self,interpolation=None,resolution=None):
+        """Set interpolation of heat maps and rows and columns of polygons in 3D surfaces (None for automatic)."""
+
+        self.surface_interpolation = interpolation
+        self.surface_resolution = resolution
+
+
+    def set_triangulation(self,directory=None):
+        """Set directory to keep triangulations of points between runs (None to keep in memory only)."""
+
+        self.triangulation_dir = directory
+
+
+    def get_triangulation(self,x,y):
+        """Triangulation of points, reused while points are unchanged and shared with data sets of the same points."""
+
+        key = point_key(x,y)
+        if self.triangulation is None or self.triangulation[0] != key:
+            self.triangulation = (key,triangulation_cache.get(x,y,key=key,directory=self.triangulation_dir))
+        return self.triangulation[1]
+
+
+    def set_pyramid(self,method=None,directory=None):
+        """Set reduction used to build heat map pyramid (None, mean or max) and directory to store it."""
+
+        if method not in (None,'mean','max'):
+            print("Pyramid method must be mean or max")
+            method = None
+        self.pyramid = method
+        self.pyramid_dir = directory
+        self.levels = None
+
+
+    def pyramid_levels(self):
+        """Heat map z at full resolution followed by successively halved grids, built when first needed."""
+
+        if self.levels is None:
+            self.levels = build_pyramid(self.data[2],method=self.pyramid or 'mean',directory=self.pyramid_dir)
+        return self.levels
+
+
+    def set_downsample(self,method=None,points=None):
+        """Set downsampling method and number of pixel columns for line graphs, and error bars drawn at every point."""
+
+        if method not in (None,'minmax','lttb'):
+            print("Downsample method must be minmax or lttb")
+            method = None
+        self.downsample = method
+        self.downsample_points = points
+
+
+    def set_rasterize(self,rasterize=None):
+        """Set whether data set is drawn as raster image within vector output (None for automatic by size)."""
+
+        self.rasterize = rasterize
+
+
     def set_contours(self,levels=None,number=10,limits=None):
         """Set contour properties."""
 
@@ -162,21 +614,54 @@ class DataSet:
         else:
             if limits is not None:
                 self.contour_levels=np.linspace(limits[0],limits[1],number)
+            elif self.plot_type in ('heat','contour','tricontour','surface_mesh','surface_points'):
+                z = self.statistics(2)
+                self.contour_levels=np.linspace(z['min'],z['max'],number)
             else:
-                self.contour_levels=np.linspace(np.min(self.data[2]),np.max(self.data[2]),number)
+                self.contour_levels=None # No z values
 
 
     def set_colour(self,colour=None,map=None,norm=None):
         """Set colour as individual or map."""
 
+        self.auto_colour = False
         # Require normalised colour map for certain plots
-        if self.plot_type == 'heat' or self.plot_type == 'contour' or self.plot_type == 'surface_mesh' or self.plot_type == 'surface_points':
+        if self.plot_type in ('heat','contour','tricontour','surface_mesh','surface_points'):
+            if map is not None:
+                self.colour_map = map
+            else:
+                self.colour_map = 'coolwarm'
+            if norm is None:
+                z = self.statistics(2)
+                self.colour_norm = Normalize(vmin=z['min'],vmax=z['max'])
+            else:
+                self.colour_norm = Normalize(vmin=norm[0],vmax=norm[1])
+            return
+
+        # Series coloured by map, from optional array of floats per series or by position of series
+        if self.plot_type == 'lines' and not isinstance(colour,str):
+            self.colour = colour
+            if map is not None:
+                self.colour_map = map
+            else:
+                self.colour_map = 'coolwarm'
+            if norm is not None:
+                self.colour_norm = Normalize(vmin=norm[0],vmax=norm[1])
+            elif colour is not None:
+                self.colour_norm = Normalize(vmin=np.min(colour),vmax=np.max(colour))
+            else:
+                self.colour_norm = Normalize(vmin=0,vmax=max(self.series_count()-1,1))
+            return
+
+        # Density plot uses colour map, with colours as optional array of floats to aggregate
+        if self.plot_type == 'density':
+            self.colour = colour
             if map is not None:
                 self.colour_map = map
             else:
                 self.colour_map = 'coolwarm'
             if norm is None:
-                self.colour_norm = Normalize(vmin=np.min(self.data[2]),vmax=np.max(self.data[2]))
+                self.colour_norm = None # Normalised to aggregated values when plotted
             else:
                 self.colour_norm = Normalize(vmin=norm[0],vmax=norm[1])
             return
@@ -185,8 +670,9 @@ class DataSet:
         if colour is None:
             # No map use automatic map
             if map is not None:
-                self.__class__.auto_colours = plt.cm.get_cmap(map)
-            self.colour = self.__class__.auto_colours(self.id)
+                self.auto_colours = get_colour_map(map)
+            self.colour = self.auto_colours(self.id)
+            self.auto_colour = True
             self.colour_map = None
         # Use single colour
         elif isinstance(colour,str):
@@ -205,3 +691,53 @@ class DataSet:
                 self.colour_norm = Normalize(vmin=norm[0],vmax=norm[1])
 
 
+class CompactDataSet(DataSet):
+    """
+    DataSet keeping its options in slots and its values as float32 by default, for plots of many small data sets.
+    Instances still have the dictionary inherited from DataSet, which stays empty unless other attributes are set.
+    Automatic label, order and colour are derived from the position in the plot when read rather than stored.
+    """
+
+    __slots__ = ('id','data','dtype','buffer','stats','levels','triangulation','auto_label','auto_order','label','zorder',
+                 'plot_type','error_x','error_y','error_width','error_interval','error_cap',
+                 'auto_marker','marker_style','marker_size','line_style','line_width','bar_width','bar_collection',
+                 'auto_colour','auto_colours','colour','colour_map','colour_norm','surface_interpolation','surface_resolution',
+                 'aggregate','density_bins','triangulation_dir','pyramid','pyramid_dir','downsample','downsample_points',
+                 'contour_levels','offsets','rasterize')
+
+
+    def __init__(self,data,**kwargs):
+        """
+        As DataSet, with values stored as float32 unless another dtype is given (None for type of data).
+        """
+
+        kwargs.setdefault('dtype',np.float32)
+        DataSet.__init__(self,data,**kwargs)
+        self.set_id(self.id)
+
+
+    def __getattr__(self,name):
+        # Only called for slots not set
+        if name == 'label' and self.auto_label:
+            return 'data_{}'.format(self.id)
+        if name == 'zorder' and self.auto_order:
+            return self.id
+        if name == 'colour' and self.auto_colour:
+            return self.auto_colours(self.id)
+        if name == 'auto_colours':
+            return DataSet.auto_colours
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__,name))
+
+
+    def set_id(self,id):
+        """Set position of data set in plot, updating automatic marker and clearing stored automatic styles."""
+
+        self.id = id
+        if self.auto_marker and self.marker_style is not None:
+            self.marker_style = self.auto_markers[id%len(self.auto_markers)]
+        for attr,auto in (('label','auto_label'),('zorder','auto_order'),('colour','auto_colour')):
+            if getattr(self,auto):
+                try:
+                    delattr(self,attr)
+                except AttributeError:
+                    pass # Already derived from position
@@ -0,0 +1,65 @@
+import threading
+
+
+class FigurePool:
+    """
+    Reusable figures and axes, kept for each combination of dimensions and figure size.
+
+    Figures are created without pyplot, so are not held by pyplot's figure manager and are freed
+    once released figures exceed the pool size.
+    Reused figures are cleared when acquired, so text takes the rc parameters of the plot acquiring them.
+    """
+
+    def __init__(self,size=4):
+        """
+        :param size: maximum number of idle figures kept for each dimensions and figure size
+        :type size: int
+        """
+
+        self.size = size
+        self.idle = {} # Idle figures and axes for each key
+        self.lock = threading.Lock()
+
+
+    def acquire(self,dimensions,figsize):
+        """Figure and axes, reused from pool if available."""
+
+        key = (dimensions,tuple(figsize))
+        with self.lock:
+            idle = self.idle.get(key)
+            reused = idle.pop() if idle else None
+        if reused is not None:
+            reused[1].clear()
+            return reused
+        # Imported when first needed, as matplotlib.figure loads mplot3d
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        if dimensions == 3:
+            from mpl_toolkits.mplot3d import Axes3D # Registers 3d projection
+            ax = fig.add_subplot(111,projection='3d')
+        else:
+            ax = fig.add_subplot(111)
+        return fig,ax
+
+
+    def release(self,fig,ax):
+        """Return figure and axes to pool."""
+
+        key = (3 if ax.name == '3d' else 2,tuple(fig.get_size_inches()))
+        with self.lock:
+            idle = self.idle.setdefault(key,[])
+            if len(idle) < self.size:
+                idle.append((fig,ax))
+
+
+    def clear(self):
+        """Remove all idle figures."""
+
+        with self.lock:
+            self.idle = {}
+
+
+# Shared pool used by default
+figure_pool = FigurePool()
@@ -0,0 +1,118 @@
+import itertools
+import numpy as np
+
+
+def read_text_columns(filename,columns=None,delimiter=',',skiprows=0,dtype=np.float64,comments='#',chunk=1048576):
+    """
+    Read columns of a delimited text file as separate 1D arrays.
+
+    Lines are parsed in chunks with numpy's compiled parser, keeping only the requested columns
+    at the requested dtype, so memory is bounded by the columns kept rather than the file size.
+
+    :param columns: indices of columns to read, defaults to all
+    :type columns: list
+    :param delimiter: column separator, None for any whitespace
+    :type delimiter: str
+    :param skiprows: number of header lines to skip
+    :type skiprows: int
+    :param dtype: type of values, e.g. np.float32 to halve memory
+    :type dtype: np.dtype
+    :param chunk: number of lines parsed at once
+    :type chunk: int
+    """
+
+    blocks = []
+    with open(filename) as f:
+        for line in itertools.islice(f,skiprows):
+            pass
+        while True:
+            lines = list(itertools.islice(f,chunk))
+            if not lines:
+                break
+            block = np.loadtxt(lines,delimiter=delimiter,usecols=columns,dtype=dtype,comments=comments,ndmin=2)
+            if block.size > 0:
+                blocks.append(block)
+    if not blocks:
+        return [np.zeros(0,dtype=dtype) for c in (columns or [0])]
+    # Gather each column into its own contiguous array
+    n = sum(block.shape[0] for block in blocks)
+    arrays = [np.empty(n,dtype=dtype) for i in range(blocks[0].shape[1])]
+    start = 0
+    while blocks:
+        block = blocks.pop(0) # Release parsed chunks as they are copied
+        for i,array in enumerate(arrays):
+            array[start:start+block.shape[0]] = block[:,i]
+        start += block.shape[0]
+    return arrays
+
+
+def read_npz(filename,keys=None,dtype=None):
+    """
+    Arrays stored in .npz archive, reading only the given keys, defaults to all in order stored.
+
+    :param dtype: convert arrays to dtype
+    :type dtype: np.dtype
+    """
+
+    with np.load(filename) as archive:
+        if keys is None:
+            keys = archive.files
+        arrays = [archive[key] for key in keys]
+    if dtype is not None:
+        arrays = [array.astype(dtype,copy=False) for array in arrays]
+    return arrays
+
+
+def read_hdf5(filename,datasets,columns=None,dtype=None,chunk=1048576):
+    """
+    Arrays from HDF5 file, requiring h5py.
+
+    Either a list of names of datasets, each read whole, or the name of one 2D dataset
+    whose columns are read in chunks of rows into separate arrays.
+
+    :param datasets: name of 2D dataset or list of names of datasets
+    :type datasets: str or list
+    :param columns: columns of 2D dataset to read, defaults to all
+    :type columns: list
+    :param dtype: convert arrays to dtype while reading
+    :type dtype: np.dtype
+    :param chunk: number of rows read at once from 2D dataset
+    :type chunk: int
+    """
+
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("Reading HDF5 files requires h5py")
+    with h5py.File(filename,'r') as f:
+        if not isinstance(datasets,str):
+            arrays = []
+            for name in datasets:
+                source = f[name]
+                arrays.append(source.astype(dtype)[()] if dtype is not None else source[()])
+            return arrays
+        source = f[datasets]
+        if columns is None:
+            columns = list(range(source.shape[1]))
+        n = source.shape[0]
+        arrays = [np.empty(n,dtype=dtype if dtype is not None else source.dtype) for c in columns]
+        for start in range(0,n,chunk):
+            block = source[start:start+chunk]
+            for array,c in zip(arrays,columns):
+                array[start:start+block.shape[0]] = block[:,c]
+        return arrays
+
+
+def grid_from_columns(x,y,z):
+    """
+    Grid axes and values from points of a complete regular grid listed in any order.
+
+    :returns: unique x, unique y and z as (ny,nx) array
+    """
+
+    order = np.lexsort((x,y)) # Rows of constant y, in increasing x
+    xs = np.unique(x)
+    ys = np.unique(y)
+    if xs.size*ys.size != z.size:
+        raise ValueError("Points do not form a complete grid")
+    return xs,ys,z[order].reshape(ys.size,xs.size)
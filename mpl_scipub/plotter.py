@@ -1,21 +1,48 @@
-import matplotlib.pyplot as plt
-import matplotlib.pylab as pylab
+import os
+import matplotlib as mpl
 import matplotlib.ticker as ticker
-from mpl_toolkits.mplot3d import Axes3D
+from matplotlib.collections import PolyCollection, LineCollection
+from matplotlib.container import Container
+from matplotlib.lines import Line2D
 import numpy as np
+from .figures import figure_pool
+from .profiling import Profiler, profiled
+from .saving import background_saver, raster_formats, output_formats, write_figure, write_and_release
+from .style import style_context, styled
+from .cache import plot_key
+from .reduction import pixel_bins, index_bins, minmax_indices, lttb_indices, bin_points
 
 
 class Plot:
     """Plot DataSet objects with matplotlib."""
 
+    # Number of bars above which bar graphs are drawn as a single collection
+    bar_collection_threshold = 1000
+    # Maximum number of polygons in automatic 3D surfaces, as mplot3d depth-sorts polygons in Python
+    surface_polygon_budget = 40000
+    # Rows and columns of mesh surfaces drawn by mplot3d by default, only exceeded when set for data set
+    surface_mesh_count = 50
+    # Estimated markers, polygons or vertices above which a data set is rasterized in vector output
+    rasterize_threshold = 100000
 
     ##### Functions to control plot settings #####
 
     def __init__(self,dim=2,elevation=20,angle=130):
         """Set default parameters"""
 
+        self.style = {'axes.xmargin':0.0,'axes.ymargin':0.0} # rc parameters applied while plotting, no padding on axes
         self.num_datasets = 0 # Total number of added data sets
         self.datasets = [] # List of added data sets
+        self.bar_cache = {} # Bar positions for each data set
+        self.bar_cache_count = 0 # Number of data sets bar positions computed for
+        self.artists = [] # Artist drawn for each data set
+        self.animated = [] # Artists redrawn by blitting in streaming updates
+        self.drawn_points = [] # Number of points in each data set when last drawn
+        self.background = None # Saved figure without animated artists
+        self.displayed = False # Figure shown without blocking, kept open after saving
+        self.figure_pool = None # Pool of reusable figures, or None to create with pyplot
+        self.render_cache = None # Cache of saved figures, or None to always draw
+        self.save_report = None # Data sets rasterized and file sizes of last save
         self.initialised = False # Figure and axes initialised
         self.finalised = False # Final plot properties adjusted
         self.set_plot_size() # Initialise plot size to 4x4cm
@@ -24,14 +51,20 @@ class Plot:
         self.set_axes() # Default axes labels
         self.set_legend() # No legend
         self.set_view(elevation=elevation,angle=angle) # Orientation for 3D plot
-        pylab.rcParams['axes.xmargin'] = 0.0 # Remove padding on x-axis
-        pylab.rcParams['axes.ymargin'] = 0.0 # Remove padding on y-axis
 
-    def set_plot_size(self, width = 4, height = 4):
-        """Set plot size in cm."""
+    def set_plot_size(self, width = 4, height = 4, dpi = 400):
+        """
+        Set plot size in cm.
+
+        :param dpi: output resolution, used as default when saving and to size downsampled data
+        :type dpi: int
+        """
 
+        self.plot_width = width
+        self.plot_height = height
+        self.plot_dpi = dpi
         params = {"figure.figsize": (width, height)}
-        pylab.rcParams.update(params)
+        self.style.update(params)
 
 
     def set_text(self, font='serif', latex=False, legend = 10, title = 10, label = 10):
@@ -75,7 +108,10 @@ class Plot:
                 'xtick.labelsize': label,
                 'ytick.labelsize': label
             }
-        pylab.rcParams.update(params)
+        # Fonts from previous call do not carry over
+        for key in ('font.family','font.serif','mathtext.fontset','text.usetex'):
+            self.style.pop(key,None)
+        self.style.update(params)
 
 
 
@@ -140,6 +176,29 @@ class Plot:
         self.axis_zlog = kwargs.get("zlog", False)
 
 
+    def set_figure_pool(self,pool=figure_pool):
+        """
+        Draw into reusable figures from pool, which are released back to the pool after saving.
+        Figures from a pool are not managed by pyplot so cannot be displayed, pass None to use pyplot.
+
+        :param pool: figure pool, defaults to shared pool
+        :type pool: FigurePool
+        """
+
+        self.figure_pool = pool
+
+
+    def set_render_cache(self,cache=None):
+        """
+        Copy saved figures from cache when data sets and settings are unchanged, rather than drawing them.
+
+        :param cache: render cache, or None to always draw
+        :type cache: RenderCache
+        """
+
+        self.render_cache = cache
+
+
     def set_view(self,elevation=None,angle=None):
         """Set view in 3D plot."""
 
@@ -153,6 +212,7 @@ class Plot:
         """Add DataSet object."""
 
         try:
+            dataset.set_id(self.num_datasets) # Automatic styles follow order in this plot
             self.datasets.append(dataset) # Append to data sets
             self.num_datasets += 1
         except:
@@ -161,6 +221,8 @@ class Plot:
 
     ##### Plotting functions #####
 
+    @profiled('initialise')
+    @styled
     def initialise_plot(self):
         """Initialise axis and figure"""
 
@@ -168,56 +230,81 @@ class Plot:
         if self.initialised:
             pass
         else:
-            if self.dimensions == 2:
+            # Import pyplot and 3D axes only when first figure made, as both are slow to import
+            import matplotlib.pyplot as plt
+            if self.figure_pool is not None:
+                self.fig, self.ax = self.figure_pool.acquire(self.dimensions,(self.plot_width,self.plot_height))
+            elif self.dimensions == 2:
                 self.fig, self.ax = plt.subplots()
             elif self.dimensions == 3:
+                from mpl_toolkits.mplot3d import Axes3D # Registers 3d projection
                 self.fig = plt.figure()
                 self.ax = self.fig.add_subplot(111, projection='3d')
+            self.animated = []
+            self.background = None
             self.initialised = True
 
 
+    @styled
     def plot(self):
-        """Plot graphs."""
+        """Plot graphs, keeping the artist drawn for each data set."""
+
+        self.initialise_plot()
+        self.artists = []
+        self.drawn_points = []
+        for i,dataset in enumerate(self.datasets):
+            self.artists.append(self.plot_dataset(i,dataset))
+            self.drawn_points.append(len(dataset.data))
+
+
+    @profiled('plot_dataset',lambda self,i,dataset: {'dataset':i,'plot_type':dataset.plot_type,'label':dataset.label})
+    @styled
+    def plot_dataset(self,i,dataset):
+        """Plot single data set according to plot type, returning artist."""
 
         if self.dimensions == 2:
-            self.initialise_plot()
-            for i,dataset in enumerate(self.datasets):
-                if dataset.plot_type == 'scatter':
-                    self.scatter_2d(dataset)
-                elif dataset.plot_type == 'line':
-                    self.line_2d(dataset)
-                elif dataset.plot_type == 'error_bar':
-                    self.errorbar_2d(dataset)
-                elif dataset.plot_type == 'error_shade':
-                    self.errorshade_2d(dataset)
-                elif dataset.plot_type == 'bar':
-                    self.bar_2d(dataset,i)
-                elif dataset.plot_type == 'heat':
-                    self.heat_2d(dataset)
-                elif dataset.plot_type == 'contour':
-                    self.contour_2d(dataset)
+            if dataset.plot_type == 'scatter':
+                return self.scatter_2d(dataset)
+            elif dataset.plot_type == 'density':
+                return self.density_2d(dataset)
+            elif dataset.plot_type == 'line':
+                return self.line_2d(dataset)
+            elif dataset.plot_type == 'lines':
+                return self.lines_2d(dataset)
+            elif dataset.plot_type == 'error_bar':
+                return self.errorbar_2d(dataset)
+            elif dataset.plot_type == 'error_shade':
+                return self.errorshade_2d(dataset)
+            elif dataset.plot_type == 'bar':
+                return self.bar_2d(dataset,i)
+            elif dataset.plot_type == 'heat':
+                return self.heat_2d(dataset)
+            elif dataset.plot_type == 'contour':
+                return self.contour_2d(dataset)
+            elif dataset.plot_type == 'tricontour':
+                return self.tricontour_2d(dataset)
         elif self.dimensions == 3:
-            self.initialise_plot()
-            for dataset in self.datasets:
-                if dataset.plot_type == 'scatter':
-                    self.scatter_3d(dataset)
-                elif dataset.plot_type == 'line':
-                    self.line_3d(dataset)
-                elif dataset.plot_type == 'surface_mesh':
-                    self.surfacemesh_3d(dataset)
-                elif dataset.plot_type == 'surface_points':
-                    self.surfacepoints_3d(dataset)
+            if dataset.plot_type == 'scatter':
+                return self.scatter_3d(dataset)
+            elif dataset.plot_type == 'line':
+                return self.line_3d(dataset)
+            elif dataset.plot_type == 'lines':
+                return self.lines_3d(dataset)
+            elif dataset.plot_type == 'surface_mesh':
+                return self.surfacemesh_3d(dataset)
+            elif dataset.plot_type == 'surface_points':
+                return self.surfacepoints_3d(dataset)
 
 
     def scatter_2d(self,dataset):
         """Scatter graph in 2D"""
 
         if dataset.colour_map is None:
-            self.ax.scatter(dataset.data[:,0], dataset.data[:,1], label=dataset.label, zorder=dataset.zorder,
+            return self.ax.scatter(dataset.data[:,0], dataset.data[:,1], label=dataset.label, zorder=dataset.zorder,
                             marker=dataset.marker_style, s=dataset.marker_size,
                             color=dataset.colour)
         else:
-            self.ax.scatter(dataset.data[:,0], dataset.data[:,1], label=dataset.label, zorder=dataset.zorder,
+            return self.ax.scatter(dataset.data[:,0], dataset.data[:,1], label=dataset.label, zorder=dataset.zorder,
                             marker=dataset.marker_style, s=dataset.marker_size,
                             c=dataset.colour, cmap=dataset.colour_map, norm=dataset.colour_norm)
 
@@ -226,37 +313,148 @@ class Plot:
         """Scatter graph in 3D"""
 
         if dataset.colour_map is None:
-            self.ax.scatter(dataset.data[:,0], dataset.data[:,1], dataset.data[:,2], label=dataset.label, zorder=dataset.zorder,
+            return self.ax.scatter(dataset.data[:,0], dataset.data[:,1], dataset.data[:,2], label=dataset.label, zorder=dataset.zorder,
                             marker=dataset.marker_style, s=dataset.marker_size,
                             color=dataset.colour)
         else:
-            self.ax.scatter(dataset.data[:,0], dataset.data[:,1], dataset.data[:,2], label=dataset.label, zorder=dataset.zorder,
+            return self.ax.scatter(dataset.data[:,0], dataset.data[:,1], dataset.data[:,2], label=dataset.label, zorder=dataset.zorder,
                             marker=dataset.marker_style, s=dataset.marker_size,
                             c=dataset.colour, cmap=dataset.colour_map, norm=dataset.colour_norm)
 
 
+    def downsample(self,dataset,x,values):
+        """
+        Indices of points to draw so line matches full data at output resolution, or None to draw all points.
+
+        :param x: x values of line
+        :type x: np.ndarray
+        :param values: arrays whose extrema must be preserved, e.g. y values and error bounds
+        :type values: list
+        """
+
+        # Only reduce plain lines, markers would be visibly removed
+        if dataset.downsample is None or dataset.marker_style is not None:
+            return None
+        if dataset.downsample_points is not None:
+            columns = dataset.downsample_points
+        else:
+            # Quarter-pixel columns so antialiased edges match full line
+            columns = 4*int(np.ceil(self.plot_width*self.plot_dpi))
+        n = x.size
+        if n <= 4*columns:
+            return None
+        # Pixel columns for 2D data in x order, otherwise buckets along the line
+        if self.dimensions == 2 and dataset.statistics(0)['monotonic']:
+            if dataset.downsample == 'lttb':
+                return lttb_indices(x,values[0],columns)
+            if self.axis_xlim is not None:
+                bins = pixel_bins(x,columns,self.axis_xlim[0],self.axis_xlim[1])
+            else:
+                bins = pixel_bins(x,columns)
+        else:
+            bins = index_bins(n,columns)
+            values = [x]+list(values)
+        return minmax_indices(bins,values)
+
+
+    def line_data(self,dataset):
+        """Coordinates of line graph, downsampled if requested."""
+
+        columns = [dataset.data[:,i] for i in range(self.dimensions)]
+        keep = self.downsample(dataset,columns[0],columns[1:])
+        if keep is not None:
+            columns = [c[keep] for c in columns]
+        return columns
+
+
     def line_2d(self,dataset):
         """Line graph in 2D"""
 
-        self.ax.plot(dataset.data[:,0], dataset.data[:,1], label=dataset.label, zorder=dataset.zorder,
+        x,y = self.line_data(dataset)
+        return self.ax.plot(x, y, label=dataset.label, zorder=dataset.zorder,
                       marker=dataset.marker_style, ms=dataset.marker_size,
                       lw=dataset.line_width, ls=dataset.line_style,
-                      color=dataset.colour)
+                      color=dataset.colour)[0]
 
 
     def line_3d(self,dataset):
         """Line graph in 3D"""
 
-        self.ax.plot(dataset.data[:,0], dataset.data[:,1], dataset.data[:,2], label=dataset.label, zorder=dataset.zorder,
+        x,y,z = self.line_data(dataset)
+        return self.ax.plot(x, y, z, label=dataset.label, zorder=dataset.zorder,
                      marker=dataset.marker_style, ms=dataset.marker_size,
                      lw=dataset.line_width, ls=dataset.line_style,
-                     color=dataset.colour)
+                     color=dataset.colour)[0]
+
+
+    def series_segments(self,dataset):
+        """Coordinates of each series, as (n_series,n_points,dimensions) array or list of (n_points,dimensions) arrays."""
+
+        columns = [dataset.column(i) for i in range(self.dimensions)]
+        if dataset.offsets is None:
+            return np.stack(columns,axis=-1)
+        return np.split(np.column_stack(columns),dataset.offsets[1:])
+
+
+    def series_colours(self,lines,dataset):
+        """Colour all series of line collection, by single colour or colour map of value per series."""
+
+        if dataset.colour_map is None:
+            lines.set_color(dataset.colour)
+            return
+        if isinstance(dataset.colour,(np.ndarray,list,tuple)):
+            lines.set_array(np.asarray(dataset.colour))
+        else:
+            lines.set_array(np.arange(len(lines.get_paths())))
+        lines.set_cmap(dataset.colour_map)
+        lines.set_norm(dataset.colour_norm)
+        lines.update_scalarmappable() # Colours available to legend before drawing
+
+
+    def lines_2d(self,dataset):
+        """Many series drawn as a single line collection in 2D, with one legend entry"""
+
+        lines = LineCollection(self.series_segments(dataset),label=dataset.label,zorder=dataset.zorder,
+                               linewidths=dataset.line_width,linestyles=dataset.line_style)
+        self.series_colours(lines,dataset)
+        self.ax.add_collection(lines)
+        self.ax.autoscale_view()
+        return lines
+
+
+    def lines_3d(self,dataset):
+        """Many series drawn as a single line collection in 3D, with one legend entry"""
+
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        lines = Line3DCollection(self.series_segments(dataset),label=dataset.label,zorder=dataset.zorder,
+                                 linewidths=dataset.line_width,linestyles=dataset.line_style)
+        self.series_colours(lines,dataset)
+        # Extents from cached statistics rather than all segments
+        x,y,z = [(s['min'],s['max']) for s in [dataset.statistics(i) for i in range(3)]]
+        self.ax.auto_scale_xyz(x,y,z,had_data=self.ax.has_data())
+        self.ax.add_collection3d(lines)
+        return lines
 
 
     def errorbar_2d(self,dataset):
         """Line graph with symmetric errors in 2D"""
 
-        self.ax.errorbar(dataset.data[:,0], dataset.data[:,1], xerr=dataset.error_x, yerr=dataset.error_y,
+        x = dataset.data[:,0]
+        y = dataset.data[:,1]
+        error_x = dataset.error_x
+        error_y = dataset.error_y
+        # Preserve extent of error bars as well as line when downsampling
+        values = [y]
+        if isinstance(error_y,np.ndarray) and error_y.ndim == 1:
+            values += [y-error_y,y+error_y]
+        # Not downsampled when drawing every nth error bar, which counts from the original points
+        keep = self.downsample(dataset,x,values) if dataset.error_interval == 1 else None
+        if keep is not None:
+            x = x[keep]
+            y = y[keep]
+            if isinstance(error_x,np.ndarray): error_x = error_x[...,keep]
+            if isinstance(error_y,np.ndarray): error_y = error_y[...,keep]
+        return self.ax.errorbar(x, y, xerr=error_x, yerr=error_y,
                      label= dataset.label, zorder=dataset.zorder, errorevery=dataset.error_interval,
                      marker=dataset.marker_style, ms=dataset.marker_size,
                      lw=dataset.line_width, ls=dataset.line_style,
@@ -270,52 +468,221 @@ class Plot:
         data = dataset.data
         y1 = data[:,1] - dataset.error_y
         y2 = data[:,1] + dataset.error_y
-        self.ax.fill_between(data[:,0],y1=y1,y2=y2,label=dataset.label, zorder=dataset.zorder, color=dataset.colour)
+        return self.ax.fill_between(data[:,0],y1=y1,y2=y2,label=dataset.label, zorder=dataset.zorder, color=dataset.colour)
+
+
+    def bar_layout(self,dataset,shift):
+        """Positions and width of bars shifted alongside other data sets, without modifying data."""
+
+        # Positions depend on number of data sets, so recompute all if changed
+        if self.bar_cache_count != self.num_datasets:
+            self.bar_cache = {}
+            self.bar_cache_count = self.num_datasets
+        cached = self.bar_cache.get(shift)
+        if cached is None or cached[0] is not dataset.data or cached[1] != dataset.bar_width:
+            total_bw = dataset.bar_width
+            bw = total_bw/self.num_datasets
+            x = dataset.data[:,0] - total_bw/2 + bw/2 + shift*bw
+            cached = (dataset.data,total_bw,x,bw)
+            self.bar_cache[shift] = cached
+        return cached[2],cached[3]
 
 
     def bar_2d(self,dataset,shift):
         """Bar graph"""
 
-        total_bw = dataset.bar_width
-        bw = total_bw/self.num_datasets
-        data = dataset.data
-        data[:,0] = data[:,0] - total_bw/2 + bw/2 + shift*bw
-        self.ax.bar(data[:,0],data[:,1],label=dataset.label,zorder=dataset.zorder,
-                    width=bw,color=dataset.colour,
-                    xerr=dataset.error_x,yerr=dataset.error_y,error_kw={'zorder':dataset.zorder+self.num_datasets})
+        x,bw = self.bar_layout(dataset,shift)
+        y = dataset.data[:,1]
+        collection = dataset.bar_collection
+        if collection is None:
+            collection = x.size > self.bar_collection_threshold
+        if not collection:
+            return self.ax.bar(x,y,label=dataset.label,zorder=dataset.zorder,
+                        width=bw,color=dataset.colour,
+                        xerr=dataset.error_x,yerr=dataset.error_y,error_kw={'zorder':dataset.zorder+self.num_datasets})
+        # All bars as one collection of rectangles rather than individual patches
+        bars = PolyCollection(self.bar_verts(x,y,bw),facecolors=dataset.colour,edgecolors='none',label=dataset.label,zorder=dataset.zorder)
+        self.ax.add_collection(bars)
+        self.ax.autoscale_view()
+        bars.errorbar = None
+        if dataset.error_x is not None or dataset.error_y is not None:
+            bars.errorbar = self.ax.errorbar(x,y,xerr=dataset.error_x,yerr=dataset.error_y,fmt='none',ecolor='k',
+                                             zorder=dataset.zorder+self.num_datasets)
+        return bars
+
+
+    def bar_verts(self,x,y,bw):
+        """Corners of bars centred on x with heights y, as (n_bars,4,2) array."""
+
+        verts = np.empty((x.size,4,2))
+        verts[:,0:2,0] = (x-bw/2)[:,np.newaxis]
+        verts[:,2:4,0] = (x+bw/2)[:,np.newaxis]
+        verts[:,[0,3],1] = 0
+        verts[:,1:3,1] = y[:,np.newaxis]
+        return verts
+
+
+    def density_2d(self,dataset):
+        """Scatter graph aggregated onto a grid at output resolution and drawn as heat map"""
+
+        x = dataset.data[:,0]
+        y = dataset.data[:,1]
+        if self.axis_xlim is not None:
+            xlim = self.axis_xlim
+        else:
+            xlim = (dataset.statistics(0)['min'],dataset.statistics(0)['max'])
+        if self.axis_ylim is not None:
+            ylim = self.axis_ylim
+        else:
+            ylim = (dataset.statistics(1)['min'],dataset.statistics(1)['max'])
+        if dataset.density_bins is not None:
+            bins = dataset.density_bins
+        else:
+            bins = (int(np.ceil(self.plot_width*self.plot_dpi)),int(np.ceil(self.plot_height*self.plot_dpi)))
+        aggregate = dataset.aggregate
+        if aggregate != 'count' and not isinstance(dataset.colour,np.ndarray):
+            print("Density {} requires colour array, using count".format(aggregate))
+            aggregate = 'count'
+        extent = (xlim[0],xlim[1],ylim[0],ylim[1])
+        z = bin_points(x,y,bins,extent,values=dataset.colour,aggregate=aggregate)
+        return self.image_2d(dataset,z,extent)
 
 
     def heat_2d(self,dataset):
         """Heat map"""
 
-        x = dataset.data[0]
-        y = dataset.data[1]
-        z = dataset.data[2]
-        self.ax.imshow(z,origin="lower",cmap=dataset.colour_map,norm=dataset.colour_norm,aspect='auto',
-                       extent=(np.min(x),np.max(x),np.min(y),np.max(y)),interpolation=dataset.surface_interpolation)
+        z,extent = self.heat_image(dataset)
+        return self.image_2d(dataset,z,extent)
+
+
+    def heat_extent(self,dataset):
+        """Extent of heat map from x and y meshes"""
+
+        x = dataset.statistics(0)
+        y = dataset.statistics(1)
+        return (x['min'],x['max'],y['min'],y['max'])
+
+
+    def heat_image(self,dataset):
+        """
+        Values and extent of heat map.
+        With a pyramid, values are cropped to axis limits and taken from the coarsest level
+        with at least one cell per output pixel, so memory scales with output resolution.
+        """
+
+        extent = self.heat_extent(dataset)
+        if dataset.pyramid is None:
+            return dataset.data[2],extent
+        levels = dataset.pyramid_levels()
+        ny,nx = levels[0].shape
+        x0,x1,y0,y1 = extent
+        dx = (x1-x0)/nx
+        dy = (y1-y0)/ny
+        # Visible cells of full resolution grid
+        c0,c1,r0,r1 = 0,nx,0,ny
+        if self.axis_xlim is not None and dx > 0:
+            c0 = int(np.clip(np.floor((min(self.axis_xlim)-x0)/dx),0,nx))
+            c1 = int(np.clip(np.ceil((max(self.axis_xlim)-x0)/dx),0,nx))
+        if self.axis_ylim is not None and dy > 0:
+            r0 = int(np.clip(np.floor((min(self.axis_ylim)-y0)/dy),0,ny))
+            r1 = int(np.clip(np.ceil((max(self.axis_ylim)-y0)/dy),0,ny))
+        if c1 <= c0 or r1 <= r0:
+            c0,c1,r0,r1 = 0,nx,0,ny
+        # Coarsest level resolving output pixels
+        width = self.plot_width*self.plot_dpi
+        height = self.plot_height*self.plot_dpi
+        level = 0
+        while level+1 < len(levels) and (c1-c0)/2**(level+1) >= width and (r1-r0)/2**(level+1) >= height:
+            level += 1
+        scale = 2**level
+        i0,i1 = c0//scale,-(-c1//scale)
+        j0,j1 = r0//scale,-(-r1//scale)
+        z = np.asarray(levels[level][j0:j1,i0:i1])
+        # Last cells of odd sized levels are padded past the data, so extent is clipped to full grid
+        return z,(x0+i0*scale*dx,x0+min(i1*scale,nx)*dx,y0+j0*scale*dy,y0+min(j1*scale,ny)*dy)
+
+
+    def image_2d(self,dataset,z,extent):
+        """Draw gridded values as image spanning extent"""
+
+        return self.ax.imshow(z,origin="lower",cmap=dataset.colour_map,norm=dataset.colour_norm,aspect='auto',
+                       extent=extent,interpolation=dataset.surface_interpolation)
 
 
     def contour_2d(self,dataset):
         """Contour plot"""
 
-        self.ax.contour(dataset.data[0],dataset.data[1],dataset.data[2],levels=dataset.contour_levels,cmap=dataset.colour_map,norm=dataset.colour_norm,
+        return self.ax.contour(dataset.data[0],dataset.data[1],dataset.data[2],levels=dataset.contour_levels,cmap=dataset.colour_map,norm=dataset.colour_norm,
                         linewidths=dataset.line_width,linestyles=dataset.line_style)
 
 
+    def tricontour_2d(self,dataset):
+        """Contour plot of scattered points, using cached triangulation"""
+
+        triangulation = dataset.get_triangulation(dataset.data[:,0],dataset.data[:,1])
+        return self.ax.tricontour(triangulation,dataset.data[:,2],levels=dataset.contour_levels,cmap=dataset.colour_map,norm=dataset.colour_norm,
+                           linewidths=dataset.line_width,linestyles=dataset.line_style)
+
+
     def surfacemesh_3d(self,dataset):
-        """Surface plot in 3D using mesh"""
+        """Surface plot in 3D using mesh, with rows and columns of polygons limited to suit output"""
 
-        self.ax.plot_surface(dataset.data[0],dataset.data[1],dataset.data[2],label=dataset.label, zorder=dataset.zorder,
-                     cmap=dataset.colour_map,norm=dataset.colour_norm)
+        rows,columns = self.surface_counts(dataset,*np.shape(dataset.data[2]),most=self.surface_mesh_count)
+        return self.ax.plot_surface(dataset.data[0],dataset.data[1],dataset.data[2],label=dataset.label, zorder=dataset.zorder,
+                     cmap=dataset.colour_map,norm=dataset.colour_norm,rcount=rows,ccount=columns)
 
 
     def surfacepoints_3d(self,dataset):
-        """Surface plot in 3D using points"""
+        """Surface plot in 3D using points, averaged onto grid when too many to triangulate"""
 
-        self.ax.plot_trisurf(dataset.data[:,0],dataset.data[:,0],dataset.data[:,2],label=dataset.label,zorder=dataset.zorder,
+        x,y,z = self.surface_points(dataset)
+        return self.ax.plot_trisurf(dataset.get_triangulation(x,y),z,label=dataset.label,zorder=dataset.zorder,
                              cmap=dataset.colour_map,norm=dataset.colour_norm)
 
 
+    def surface_counts(self,dataset,rows,columns,polygons_per_cell=1,most=None):
+        """
+        Rows and columns of surface cells, as set for data set or otherwise reduced from those given
+        to keep the number of polygons within budget and cells at least two pixels across.
+
+        :param most: largest automatic number of rows and columns
+        :type most: int
+        """
+
+        if dataset.surface_resolution is not None:
+            resolution = np.broadcast_to(dataset.surface_resolution,2)
+            return min(int(resolution[0]),rows),min(int(resolution[1]),columns)
+        cells = self.surface_polygon_budget/polygons_per_cell
+        pixels = max(self.plot_width,self.plot_height)*self.plot_dpi/2
+        # Keep aspect ratio of grid
+        ratio = rows/max(columns,1)
+        rows = min(rows,pixels,np.sqrt(cells*ratio))
+        columns = min(columns,pixels,np.sqrt(cells/ratio))
+        if most is not None:
+            rows,columns = min(rows,most),min(columns,most)
+        return max(int(rows),2),max(int(columns),2)
+
+
+    def surface_points(self,dataset):
+        """Surface points, replaced by mean of points in each cell of a grid when more than fit in polygon budget."""
+
+        x = dataset.data[:,0]
+        y = dataset.data[:,1]
+        z = dataset.data[:,2]
+        # Triangulation has about two triangles per point
+        rows,columns = self.surface_counts(dataset,x.size,x.size,polygons_per_cell=2)
+        if x.size <= rows*columns:
+            return x,y,z
+        sx = dataset.statistics(0)
+        sy = dataset.statistics(1)
+        extent = (sx['min'],sx['max'],sy['min'],sy['max'])
+        means = [bin_points(x,y,(columns,rows),extent,values=v,aggregate='mean') for v in (x,y,z)]
+        keep = np.isfinite(means[0])&np.isfinite(means[1])&np.isfinite(means[2])
+        return [m[keep] for m in means]
+
+
+    @profiled('finalise')
+    @styled
     def finalise_plot(self):
         """Finalise plot properties - called when saved or visualised"""
 
@@ -327,53 +694,10 @@ class Plot:
             # Labels
             self.ax.set_xlabel(self.axis_xlabel)
             self.ax.set_ylabel(self.axis_ylabel)
-            # X ticks
-            if self.axis_xticks is not None:
-                x_major = self.axis_xticks[0]
-                x_minor = self.axis_xticks[1]
-            else:
-                x_major_locator = self.ax.xaxis.get_major_locator()
-                auto_major = x_major_locator()
-                x_major = auto_major[1]-auto_major[0]
-                x_minor = x_major/5
-            # Y ticks
-            if self.axis_yticks is not None:
-                y_major = self.axis_yticks[0]
-                y_minor = self.axis_yticks[1]
-            else:
-                y_major_locator = self.ax.yaxis.get_major_locator()
-                auto_major = y_major_locator()
-                y_major = auto_major[1]-auto_major[0]
-                y_minor = y_major/5
-            # X limits
-            if self.axis_xlim is not None:
-                self.ax.set_xlim(self.axis_xlim)
-            else:
-                auto_xlim=self.ax.get_xlim()
-                xlim=[np.round(auto_xlim[0]/x_major)*x_major,np.round(auto_xlim[1]/x_major)*x_major]
-                # if xlim[0]>auto_xlim[0]: xlim[0]-=major_tick
-                # if xlim[1]<auto_xlim[1]: xlim[1]+=major_tick
-                self.ax.set_xlim(xlim)
-            x_minor_locator = ticker.MultipleLocator(x_minor)
-            x_major_locator = ticker.MultipleLocator(x_major)
-            self.ax.xaxis.set_minor_locator(x_minor_locator)
-            self.ax.xaxis.set_major_locator(x_major_locator)
-            # Y limits
-            if self.axis_ylim is not None:
-                self.ax.set_ylim(self.axis_ylim)
-            else:
-                auto_ylim=self.ax.get_ylim()
-                ylim=[(np.round(auto_ylim[0]/y_major)-0.5)*y_major,(np.round(auto_ylim[1]/y_major)+0.5)*y_major]
-                # if ylim[0]>auto_ylim[0]: ylim[0]-=major_tick
-                # if ylim[1]<auto_ylim[1]: ylim[1]+=major_tick
-                self.ax.set_ylim(ylim)
-            y_minor_locator = ticker.MultipleLocator(y_minor)
-            y_major_locator = ticker.MultipleLocator(y_major)
-            self.ax.yaxis.set_minor_locator(y_minor_locator)
-            self.ax.yaxis.set_major_locator(y_major_locator)
-            # Log scales
+            # Log scales, applied first so limits and ticks are found on the final scale
             if self.axis_xlog: self.ax.set_xscale('log')
             if self.axis_ylog: self.ax.set_yscale('log')
+            self.finalise_limits()
             if self.dimensions == 3:
                 # 3D additions
                 self.ax.set_zlabel(self.axis_zlabel)
@@ -409,30 +733,529 @@ class Plot:
                     legend = self.ax.legend(handles, labels, title=self.legend_title, ncol=self.legend_columns,
                                              bbox_to_anchor=self.legend_anchor)
                 legend.get_frame().set_edgecolor('grey')
-            # Reset ids to reuse auto-colours and markers
-            self.datasets[0].__class__.auto_id = 0
             self.finalised = True
 
 
+    def auto_tick_spacing(self,axis,interval):
+        """Major tick spacing chosen by matplotlib for view interval of axis."""
+
+        locator = ticker.AutoLocator()
+        locator.set_axis(axis) # Number of ticks depends on axis length and font size only
+        auto_major = locator.tick_values(*interval)
+        return auto_major[1]-auto_major[0]
+
+
+    def dataset_limits(self,i,dataset,artist):
+        """
+        x and y extents of data set as drawn, from cached statistics or image extent,
+        or None if not known without a pass over the data.
+        """
+
+        if dataset.plot_type in ('heat','density'):
+            left,right,bottom,top = artist.get_extent()
+            return [(min(left,right),max(left,right)),(min(bottom,top),max(bottom,top))]
+        if dataset.plot_type == 'line' and dataset.downsample is not None:
+            # Points kept by downsampling, fewer than output pixels
+            xy = artist.get_xydata()
+            return [(np.nanmin(xy[:,0]),np.nanmax(xy[:,0])),(np.nanmin(xy[:,1]),np.nanmax(xy[:,1]))]
+        if dataset.plot_type not in ('line','lines','scatter','contour','tricontour','error_shade','bar'):
+            return None
+        if 0 not in dataset.stats or 1 not in dataset.stats:
+            return None # Matplotlib already found extents as artists were added
+        x = dataset.statistics(0)
+        y = dataset.statistics(1)
+        n = dataset.column(0).size
+        if x['finite'] != n or y['finite'] != n:
+            return None # Points missing x or y are skipped, so extents depend on both
+        limits = [(x['min'],x['max']),(y['min'],y['max'])]
+        if dataset.plot_type == 'error_shade':
+            y = dataset.column(1)
+            limits[1] = (np.nanmin(y-dataset.error_y),np.nanmax(y+dataset.error_y))
+        elif dataset.plot_type == 'bar':
+            if dataset.error_x is not None or dataset.error_y is not None:
+                return None
+            # Shifted bar positions and bars drawn from zero
+            x,bw = self.bar_layout(dataset,i)
+            shift = x[0]-dataset.data[0,0] if len(x) > 0 else 0
+            limits[0] = (limits[0][0]+shift-bw/2,limits[0][1]+shift+bw/2)
+            limits[1] = (min(limits[1][0],0),max(limits[1][1],0))
+        return limits
+
+
+    def data_limits(self):
+        """
+        x and y extents of all data sets, each None if matplotlib's autoscaling is needed to find it,
+        as for data sets without cached statistics, 3D plots, error bars, margins around data
+        or artists added to the axes directly.
+        """
+
+        if self.dimensions != 2 or not self.datasets or self.ax.margins() != (0,0):
+            return [None,None]
+        own = set()
+        for artist in self.artists:
+            if artist is not None:
+                own.update(self.layer_artists(artist))
+        for artist in list(self.ax.lines)+list(self.ax.collections)+list(self.ax.images)+list(self.ax.patches):
+            if artist not in own:
+                return [None,None]
+        extents = []
+        for i,(dataset,artist) in enumerate(zip(self.datasets,self.artists)):
+            limits = self.dataset_limits(i,dataset,artist)
+            if limits is None:
+                return [None,None]
+            extents.append(limits)
+        extents = np.array(extents,dtype=np.float64) # (n_datasets,2,2)
+        limits = []
+        for i in range(2):
+            lower = np.nanmin(extents[:,i,0]) if np.any(np.isfinite(extents[:,i,0])) else np.nan
+            upper = np.nanmax(extents[:,i,1]) if np.any(np.isfinite(extents[:,i,1])) else np.nan
+            limits.append((lower,upper) if np.isfinite(lower) and np.isfinite(upper) else None)
+        return limits
+
+
+    def view_interval(self,axis,limits):
+        """Automatic view interval of axis, as autoscaling with no margins gives for data extent if known."""
+
+        if limits is None:
+            return getattr(self.ax,'get_{}lim'.format(axis))()
+        locator = ticker.AutoLocator()
+        lower,upper = locator.nonsingular(*limits)
+        return locator.view_limits(lower,upper)
+
+
+    def finalise_limits(self):
+        """
+        Set tick spacing and axis limits, rounding limits to major ticks if not set by user.
+
+        Automatic ticks and limits are found from cached extents of the data sets rather than
+        by autoscaling every artist, giving the same result. Log axes keep matplotlib's log ticks,
+        with automatic limits widened to whole decades.
+        """
+
+        limits = self.data_limits()
+        spacing = []
+        for i,axis in enumerate(('x','y')):
+            fixed = getattr(self,'axis_{}lim'.format(axis))
+            ticks = getattr(self,'axis_{}ticks'.format(axis))
+            set_lim = getattr(self.ax,'set_{}lim'.format(axis))
+            axis_object = getattr(self.ax,'{}axis'.format(axis))
+            if getattr(self,'axis_{}log'.format(axis)):
+                if fixed is None:
+                    lower,upper = getattr(self.ax,'get_{}lim'.format(axis))()
+                    if lower > 0:
+                        fixed = (10**np.floor(np.log10(lower)),10**np.ceil(np.log10(upper)))
+                if fixed is not None:
+                    set_lim(fixed)
+                spacing.append(None)
+                continue
+            view = None
+            if ticks is not None:
+                major,minor = ticks
+            else:
+                view = self.view_interval(axis,limits[i])
+                major = self.auto_tick_spacing(axis_object,view)
+                minor = major/5
+            if fixed is None:
+                if view is None:
+                    view = self.view_interval(axis,limits[i])
+                # Limits on whole major ticks, y padded by half a tick
+                pad = 0.5 if axis == 'y' else 0
+                fixed = [(np.round(view[0]/major)-pad)*major,(np.round(view[1]/major)+pad)*major]
+            set_lim(fixed)
+            axis_object.set_minor_locator(ticker.MultipleLocator(minor))
+            axis_object.set_major_locator(ticker.MultipleLocator(major))
+            spacing.append(major)
+        self.tick_spacing = tuple(spacing)
+
+
+    ##### Streaming updates #####
+
+    @profiled('update')
+    @styled
+    def update(self):
+        """
+        Redraw figure after rows appended to data sets.
+
+        Line and scatter artists are updated in place and redrawn over a saved background by blitting.
+        Axis limits not set by the user grow to contain new points, checking only points added since
+        the last update, and trigger a full redraw when changed.
+        """
+
+        if not self.initialised:
+            self.plot()
+        self.finalise_plot()
+        canvas = self.fig.canvas
+        blit = getattr(canvas,'supports_blit',False)
+        redraw = self.background is None or not blit
+        for i,(dataset,artist) in enumerate(zip(self.datasets,self.artists)):
+            if not self.update_artist(i):
+                continue
+            if blit and artist not in self.animated:
+                artist.set_animated(True) # Exclude from background
+                self.animated.append(artist)
+                redraw = True
+            n = len(dataset.data)
+            start = self.drawn_points[i] if self.drawn_points[i] <= n else 0
+            if n > start and self.extend_limits(dataset.data[start:n]):
+                redraw = True
+            self.drawn_points[i] = n
+        if not blit:
+            canvas.draw_idle()
+            return
+        if redraw:
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            canvas.restore_region(self.background)
+        for artist in self.animated:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+
+    def update_artist(self,i):
+        """Set data of existing artist from data set, returning False if artist cannot be updated in place."""
+
+        dataset = self.datasets[i]
+        artist = self.artists[i]
+        if dataset.plot_type == 'line' and self.dimensions == 2:
+            artist.set_data(*self.line_data(dataset))
+        elif dataset.plot_type == 'line' and self.dimensions == 3:
+            artist.set_data_3d(*self.line_data(dataset))
+        elif dataset.plot_type == 'lines':
+            artist.set_segments(self.series_segments(dataset))
+            self.series_colours(artist,dataset)
+        elif dataset.plot_type == 'scatter' and self.dimensions == 2:
+            artist.set_offsets(np.column_stack((dataset.data[:,0],dataset.data[:,1])))
+        elif dataset.plot_type == 'scatter' and self.dimensions == 3:
+            artist._offsets3d = (dataset.data[:,0],dataset.data[:,1],dataset.data[:,2]) # No public setter in mplot3d
+        elif dataset.plot_type == 'heat':
+            z,extent = self.heat_image(dataset)
+            artist.set_data(z)
+            artist.set_extent(extent)
+        elif dataset.plot_type == 'bar' and artist.errorbar is None:
+            x,bw = self.bar_layout(dataset,i)
+            y = dataset.data[:,1]
+            if isinstance(artist,PolyCollection):
+                if len(artist.get_paths()) != x.size:
+                    return False
+                artist.set_verts(self.bar_verts(x,y,bw))
+            else:
+                if len(artist.patches) != x.size:
+                    return False
+                for patch,a,b in zip(artist.patches,x,y):
+                    patch.set_x(a-bw/2)
+                    patch.set_height(b)
+        else:
+            return False
+        return True
+
+
+    def remove_artist(self,i):
+        """Remove artist drawn for data set, with any attached error bars."""
+
+        artist = self.artists[i]
+        if artist is None:
+            return
+        if getattr(artist,'errorbar',None) is not None:
+            artist.errorbar.remove()
+        if artist in self.animated:
+            self.animated.remove(artist)
+        artist.remove()
+        self.artists[i] = None
+
+
+    ##### Re-rendering with new data #####
+
+    @styled
+    def rebind(self,dataset_index,data,copy=True):
+        """
+        Replace data of a plotted data set, updating its artist in place where possible.
+
+        Other artists, labels and legend are kept, and only axis limits and ticks not set by the user are
+        recomputed, so saving the next frame of a parameter sweep costs a redraw rather than a rebuild.
+        Colour normalisation and contour levels are kept from the original data, giving consistent colours
+        across frames.
+
+        :param dataset_index: index of data set in order added
+        :type dataset_index: int
+        :param data: new data in same format as original
+        :type data: np.ndarray
+        :param copy: copy policy, as for DataSet
+        :type copy: bool
+        """
+
+        dataset = self.datasets[dataset_index]
+        dataset.set_data(data,copy=copy,dtype=dataset.dtype) # Keep stored precision
+        if not self.initialised:
+            return
+        if self.finalised and self.dimensions == 2:
+            # Extents from statistics, computed once per data set, so later frames need not rescan all artists
+            for d in self.datasets:
+                d.statistics(0)
+                d.statistics(1)
+        if not self.update_artist(dataset_index):
+            self.remove_artist(dataset_index)
+            self.artists[dataset_index] = self.plot_dataset(dataset_index,dataset)
+        self.drawn_points[dataset_index] = len(dataset.data)
+        self.background = None
+        if self.finalised and (self.axis_xlim is None or self.axis_ylim is None
+                               or self.axis_xticks is None or self.axis_yticks is None):
+            if None in self.data_limits():
+                self.autoscale() # Extents found by matplotlib from all artists
+            self.finalise_limits()
+
+
+    def autoscale(self):
+        """Reset automatic axis limits to fit current data of all artists."""
+
+        self.ax.set_autoscale_on(True)
+        if self.dimensions == 3:
+            # Extents from cached statistics rather than all points
+            had_data = False
+            for dataset in self.datasets:
+                stats = [dataset.statistics(i) for i in range(3)]
+                if min(s['finite'] for s in stats) == 0:
+                    continue
+                x,y,z = [(s['min'],s['max']) for s in stats]
+                self.ax.auto_scale_xyz(x,y,z,had_data=had_data)
+                had_data = True
+            return
+        self.ax.relim()
+        # Collections are not included by relim, so add their limits as done when first added to axes
+        for collection in self.ax.collections:
+            datalim = collection.get_datalim(self.ax.transData)
+            points = datalim.get_points()
+            if np.all(np.isfinite(points)):
+                self.ax.update_datalim(points)
+        self.ax.autoscale_view()
+
+
+    def extend_limits(self,points):
+        """Grow automatic axis limits to contain points, to whole major ticks in 2D. Returns whether limits changed."""
+
+        changed = False
+        axes = [('x',self.axis_xlim),('y',self.axis_ylim)]
+        if self.dimensions == 3:
+            axes.append(('z',self.axis_zlim))
+        for i,(axis,fixed) in enumerate(axes):
+            if fixed is not None:
+                continue
+            lower,upper = getattr(self.ax,'get_{}lim'.format(axis))()
+            low = np.nanmin(points[:,i])
+            high = np.nanmax(points[:,i])
+            if low >= lower and high <= upper:
+                continue
+            if self.dimensions == 2 and self.tick_spacing[i] is not None:
+                major = self.tick_spacing[i]
+                low = np.floor(low/major)*major
+                high = np.ceil(high/major)*major
+            getattr(self.ax,'set_{}lim'.format(axis))(min(lower,low),max(upper,high))
+            changed = True
+        return changed
+
+
     ##### Save or visualise #####
 
-    def display(self):
-        """Display figure."""
+    @styled
+    def display(self,block=True):
+        """Display figure, use block=False to keep figure open for streaming updates."""
 
+        import matplotlib.pyplot as plt
+        if self.initialised and self.figure_pool is None and not plt.fignum_exists(self.fig.number):
+            self.detach_figure() # Removed from pyplot after saving, so drawn again to show
+        if not self.initialised:
+            self.plot()
         self.finalise_plot() # Apply final changes to plot
-        plt.show()
+        if block:
+            plt.show()
+            self.close() # Shown figure finished with, next plot starts a new one
+        else:
+            plt.show(block=False)
+            plt.pause(0.001)
+            self.displayed = True
+
+
+    @styled
+    def close(self):
+        """Release figure, returning it to figure pool if used or closing it in pyplot."""
+
+        if not self.initialised:
+            return
+        if self.figure_pool is not None:
+            self.figure_pool.release(self.fig,self.ax)
+        else:
+            import matplotlib.pyplot as plt
+            plt.close(self.fig)
+        self.detach_figure()
+
+
+    def detach_figure(self):
+        """Remove figure and axes from plot, returning them, so next plot starts a new figure."""
+
+        fig,ax = self.fig,self.ax
+        del self.fig, self.ax
+        self.artists = []
+        self.animated = []
+        self.background = None
+        self.displayed = False
         self.initialised = False
         self.finalised = False
+        return fig,ax
 
 
-    def save(self, name="plot", fmt="pdf", dpi_quality=400):
-        """Save figure."""
+    @profiled('save')
+    def save(self, name="plot", fmt="pdf", dpi_quality=None, close=None):
+        """
+        Save figure, by default at resolution set with plot size.
+        Several formats can be written from one layout of the figure by giving a list of formats
+        or (format,dpi) pairs, e.g. fmt=["pdf","svg",("png",600)].
+
+        Data sets larger than rasterize_threshold, or set to rasterize, are drawn as images at dpi_quality
+        within vector formats, keeping axes, text and legend as vectors. The data sets rasterized and sizes
+        of files written are reported in save_report.
+
+        :param fmt: output format or list of formats, each given once
+        :type fmt: str or list
+        :param close: release figure after saving, always done when using a figure pool. By default the figure
+            stays with the plot but is removed from pyplot, so is freed with the plot, unless shown
+            with display(block=False) or matplotlib is in interactive mode
+        :type close: bool
+        """
+
+        if dpi_quality is None:
+            dpi_quality = self.plot_dpi
+        formats = output_formats(fmt,dpi_quality)
+        if self.render_cache is not None:
+            with style_context(self.style):
+                key = plot_key(self) # Hash of rc parameters with style applied
+            if self.render_cache.fetch(key,name,formats):
+                # Copied from cache, so layers not drawn
+                self.save_report = {'layers':None,'files':{name+"."+f:os.path.getsize(name+"."+f) for f,dpi in formats}}
+                return
+        # Style applied while artists are made, not while the figure is encoded
+        with style_context(self.style):
+            if not self.initialised:
+                self.plot() # Figure released by previous save
+            self.finalise_plot() # Apply final changes to plot
+            for artist in self.animated:
+                artist.set_animated(False) # Include streamed artists in output
+            layers = self.rasterize_layers(formats)
+        filenames = write_figure(self.fig,name,formats,self.dimensions,self.style)
+        self.save_report = {'layers':layers,'files':{f:os.path.getsize(f) for f in filenames}}
+        if self.render_cache is not None:
+            self.render_cache.store(key,name,formats)
+        for artist in self.animated:
+            artist.set_animated(True)
+        self.background = None
+        if close or self.figure_pool is not None:
+            self.close()
+        elif close is None and not (self.displayed or mpl.is_interactive()):
+            # pyplot keeps every figure until closed, so hand it to the plot rather than leak it
+            import matplotlib.pyplot as plt
+            plt.close(self.fig)
+
+
+    def save_async(self, name="plot", fmt="pdf", dpi_quality=None, saver=None):
+        """
+        Save figure on a background thread, returning a Future giving the filename, or list of filenames
+        when given a list of formats, once written.
 
-        self.finalise_plot() # Apply final changes to plot
-        filename = name+"."+fmt
-        if self.dimensions == 2:
-            plt.savefig(filename, dpi=dpi_quality, bbox_inches="tight")
-        elif self.dimensions == 3: # Prevent cutoff
-            plt.savefig(filename, dpi=dpi_quality)
+        The finished figure is detached from the plot before returning, so the plot or its data sets
+        can be changed, or a new plot made, while the figure is written.
+        Waits if the saver already has its limit of figures pending.
 
+        :param saver: background saver, defaults to shared saver with one thread
+        :type saver: BackgroundSaver
+        """
+
+        if dpi_quality is None:
+            dpi_quality = self.plot_dpi
+        with style_context(self.style):
+            if not self.initialised:
+                self.plot()
+            self.finalise_plot() # Apply final changes to plot
+            for artist in self.animated:
+                artist.set_animated(False) # Include streamed artists in output
+            layers = self.rasterize_layers(output_formats(fmt,dpi_quality))
+            self.save_report = {'layers':layers,'files':None} # Files written later
+            pool = self.figure_pool
+            fig,ax = self.detach_figure()
+            if pool is None:
+                # Hand figure from pyplot to the save, drawing with its own canvas off the main thread
+                import matplotlib.pyplot as plt
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                plt.close(fig)
+                FigureCanvasAgg(fig)
+        if saver is None:
+            saver = background_saver
+        # Submitted without style applied, as the save lays out the figure with it on its thread and may wait for a free slot
+        return saver.submit(write_and_release,fig,ax,name,fmt,dpi_quality,self.dimensions,pool,dict(self.style))
+
+
+    def layer_artists(self,artist):
+        """Artists drawn for data set, including parts of containers and attached error bars."""
+
+        artists = list(artist.get_children()) if isinstance(artist,Container) else [artist]
+        if getattr(artist,'errorbar',None) is not None:
+            artists += artist.errorbar.get_children()
+        return artists
+
+
+    def layer_size(self,dataset,artist):
+        """Estimated number of markers, polygons or vertices written for data set in vector output."""
+
+        if dataset.plot_type in ('heat','density'):
+            return 0 # Drawn as images, embedded as rasters in any format
+        if dataset.plot_type == 'surface_mesh':
+            rows,columns = self.surface_counts(dataset,*np.shape(dataset.data[2]),most=self.surface_mesh_count)
+            return rows*columns
+        if dataset.plot_type in ('contour','tricontour'):
+            return sum(len(path.vertices) for path in artist.get_paths())
+        if isinstance(artist,Line2D):
+            return len(artist.get_xydata()) # Points remaining after downsampling
+        return dataset.column(0).size
+
+
+    def rasterize_layers(self,formats):
+        """
+        Rasterize artists of data sets too large to write efficiently as vector paths, when saving vector formats.
+        Returns estimated size of each data set and whether it is rasterized.
+
+        :param formats: (format,dpi) pairs being saved
+        :type formats: list
+        """
+
+        vector = any(fmt not in raster_formats for fmt,dpi in formats)
+        layers = []
+        for i,(dataset,artist) in enumerate(zip(self.datasets,self.artists)):
+            if artist is None:
+                continue
+            size = self.layer_size(dataset,artist)
+            rasterize = dataset.rasterize
+            if rasterize is None:
+                rasterize = size > self.rasterize_threshold
+            rasterize = bool(rasterize and vector)
+            for a in self.layer_artists(artist):
+                a.set_rasterized(rasterize)
+            layers.append({'dataset':i,'label':dataset.label,'plot_type':dataset.plot_type,'size':size,
+                           'rasterized':rasterize})
+        return layers
+
+
+    ##### Profiling #####
+
+    def profile(self,allocations=False,cprofile=False,hooks=None):
+        """
+        Profiler recording time in each stage of creating data sets, plotting and saving,
+        for use as context manager, e.g. with plot.profile() as profiler: plot.save(), then profiler.report().
+
+        :param allocations: record memory allocated in each stage
+        :type allocations: bool
+        :param cprofile: also run cProfile, for export with profiler.dump_stats
+        :type cprofile: bool
+        :param hooks: functions called with record of each stage when it ends
+        :type hooks: list
+        """
 
+        return Profiler(allocations=allocations,cprofile=cprofile,hooks=hooks)
@@ -0,0 +1,212 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# Profiler recording stages, None when profiling inactive
+active = None
+
+
+class Profiler:
+    """
+    Records wall time, and optionally memory allocated, in each stage of making plots.
+
+    Use as a context manager around code creating data sets and plots.
+    Stages recorded are data set creation, figure initialisation, plotting of each data set,
+    finalising plot properties, saving and the savefig encode within saving.
+    """
+
+    def __init__(self,allocations=False,cprofile=False,hooks=None):
+        """
+        :param allocations: record memory allocated in each stage with tracemalloc, which slows execution
+        :type allocations: bool
+        :param cprofile: also run cProfile while active, for export with dump_stats
+        :type cprofile: bool
+        :param hooks: functions called with record of each stage when it ends
+        :type hooks: list
+        """
+
+        self.allocations = allocations
+        self.hooks = list(hooks) if hooks is not None else []
+        self.profile = cProfile.Profile() if cprofile else None
+        self.records = [] # Record for each completed stage
+        self.stack = [] # Peak memory of open stages
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.previous = None
+        self.tracing = False
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self,*exc):
+        self.stop()
+
+
+    def start(self):
+        """Start recording stages."""
+
+        global active
+        self.previous = active
+        active = self
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+        if self.profile is not None:
+            self.profile.enable()
+
+
+    def stop(self):
+        """Stop recording stages."""
+
+        global active
+        if self.profile is not None:
+            self.profile.disable()
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        active = self.previous
+
+
+    @contextmanager
+    def stage(self,name,**info):
+        """Record wall time and allocations of code in context as named stage, with extra details in info."""
+
+        if self.allocations and tracemalloc.is_tracing():
+            current,peak = tracemalloc.get_traced_memory()
+            # Nested stages reset peak, so carry peak so far to enclosing stage
+            if self.stack:
+                self.stack[-1] = max(self.stack[-1],peak)
+            tracemalloc.reset_peak()
+            self.stack.append(current)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage':name,'start':start-self.origin,'time':time.perf_counter()-start,
+                      'thread':threading.get_ident()}
+            if self.allocations and tracemalloc.is_tracing():
+                end,peak = tracemalloc.get_traced_memory()
+                peak = max(peak,self.stack.pop())
+                if self.stack:
+                    self.stack[-1] = max(self.stack[-1],peak)
+                record['allocated'] = end-current
+                record['peak_allocated'] = peak-current
+            record.update(info)
+            with self.lock:
+                self.records.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+
+    def report(self):
+        """
+        Structured report of recorded stages, as dict with records of each stage,
+        totals for each stage name and totals for each data set.
+        """
+
+        stages = {}
+        datasets = {}
+        for record in self.records:
+            total = stages.setdefault(record['stage'],{'count':0,'time':0.0})
+            total['count'] += 1
+            total['time'] += record['time']
+            if 'dataset' in record:
+                total = datasets.setdefault(record['dataset'],{'plot_type':record.get('plot_type'),
+                                                              'label':record.get('label'),'time':0.0})
+                total['time'] += record['time']
+        return {'records':list(self.records),'stages':stages,'datasets':datasets}
+
+
+    def to_json(self,filename):
+        """Write report as JSON."""
+
+        with open(filename,'w') as f:
+            json.dump(self.report(),f,indent=2,default=str)
+
+
+    def to_chrome_trace(self,filename):
+        """Write recorded stages in Chrome trace event format, for chrome://tracing or Perfetto."""
+
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = {key:value for key,value in record.items() if key not in ('stage','start','time','thread')}
+            events.append({'name':record['stage'],'ph':'X','pid':pid,'tid':record['thread'],
+                           'ts':record['start']*1e6,'dur':record['time']*1e6,'args':args})
+        with open(filename,'w') as f:
+            json.dump({'traceEvents':events},f,default=str)
+
+
+    def dump_stats(self,filename):
+        """Write cProfile statistics, readable with pstats, when profiler created with cprofile=True."""
+
+        if self.profile is None:
+            print("Profiler not created with cprofile=True")
+            return
+        self.profile.dump_stats(filename)
+
+
+def stage(name,**info):
+    """Context recording stage in active profiler, doing nothing if profiling inactive."""
+
+    if active is None:
+        return nullcontext()
+    return active.stage(name,**info)
+
+
+def profiled(name,info=None):
+    """
+    Decorator recording each call of function as stage in active profiler.
+
+    :param info: function of the same arguments returning dict of details to record
+    :type info: function
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args,**kwargs):
+            if active is None:
+                return function(*args,**kwargs)
+            details = info(*args,**kwargs) if info is not None else {}
+            with active.stage(name,**details):
+                return function(*args,**kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_from_environment():
+    """
+    Profile whole process when MPL_SCIPUB_PROFILE is set to an output filename, written at exit.
+    Files ending .prof are written as cProfile statistics, .trace as Chrome trace, otherwise as JSON report.
+    Set MPL_SCIPUB_PROFILE_ALLOCATIONS=1 to also record allocations.
+    """
+
+    filename = os.environ.get('MPL_SCIPUB_PROFILE')
+    if not filename:
+        return
+    profiler = Profiler(allocations=os.environ.get('MPL_SCIPUB_PROFILE_ALLOCATIONS') == '1',
+                        cprofile=filename.endswith('.prof'))
+    profiler.start()
+
+    def write():
+        profiler.stop()
+        if filename.endswith('.prof'):
+            profiler.dump_stats(filename)
+        elif filename.endswith('.trace'):
+            profiler.to_chrome_trace(filename)
+        else:
+            profiler.to_json(filename)
+    atexit.register(write)
+
+
+profile_from_environment()
@@ -0,0 +1,286 @@
+import hashlib
+import math
+import os
+import numpy as np
+
+
+##### Line downsampling #####
+
+def pixel_bins(x,columns,lower=None,upper=None):
+    """
+    Assign each point to a pixel column.
+
+    :param x: x values, sorted in ascending order
+    :type x: np.ndarray
+    :param columns: number of pixel columns spanning lower to upper
+    :type columns: int
+    :param lower: x value at left edge of axes, defaults to minimum of x
+    :type lower: float
+    :param upper: x value at right edge of axes, defaults to maximum of x
+    :type upper: float
+    """
+
+    if lower is None: lower = x[0]
+    if upper is None: upper = x[-1]
+    span = upper-lower
+    if span <= 0:
+        return np.zeros(x.size,dtype=np.int64)
+    # Points outside axes keep columns of the same pixel width
+    return np.floor((x-lower)*(columns/span)).astype(np.int64)
+
+
+def index_bins(n,buckets):
+    """Assign each of n points to one of equally sized buckets along the index."""
+
+    return (np.arange(n,dtype=np.int64)*buckets)//max(n,1)
+
+
+def minmax_indices(bins,values):
+    """
+    Indices of points preserving the rendered envelope of a line.
+
+    For each run of equal bins the first, last, minimum and maximum points of every array in values are kept,
+    so a line drawn through the selected points covers the same pixels as the full line.
+    Extrema ignore nan values, and points either side of each change between finite and non-finite values
+    are kept so breaks in the line remain.
+
+    :param bins: non-decreasing bin of each point
+    :type bins: np.ndarray
+    :param values: arrays whose extrema must be preserved within each bin
+    :type values: list
+    """
+
+    n = bins.size
+    if n == 0:
+        return np.zeros(0,dtype=np.int64)
+    starts = np.flatnonzero(np.diff(bins))+1
+    starts = np.concatenate(([0],starts))
+    ends = np.concatenate((starts[1:]-1,[n-1]))
+    keep = [starts,ends]
+    counts = np.diff(np.concatenate((starts,[n])))
+    for v in values:
+        # Locate first occurrence of bin extremum by matching against broadcast reduction
+        for reduce in (np.fmin,np.fmax):
+            extrema = np.repeat(reduce.reduceat(v,starts),counts)
+            hits = np.flatnonzero(v==extrema)
+            first = np.unique(bins[hits],return_index=True)[1]
+            keep.append(hits[first])
+        changes = np.flatnonzero(np.diff(np.isfinite(v)))
+        keep += [changes,changes+1]
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(x,y,points):
+    """
+    Indices of points selected by largest-triangle-three-buckets downsampling.
+
+    :param x: x values, sorted in ascending order
+    :type x: np.ndarray
+    :param y: y values
+    :type y: np.ndarray
+    :param points: number of points to select, including first and last
+    :type points: int
+    """
+
+    n = x.size
+    if points >= n or points < 3:
+        return np.arange(n)
+    # Bucket edges for interior points, first and last point always kept
+    edges = np.linspace(1,n-1,points-1).astype(np.int64)
+    selected = np.zeros(points,dtype=np.int64)
+    selected[-1] = n-1
+    a = 0
+    for i in range(points-2):
+        lo,hi = edges[i],edges[i+1]
+        # Average of next bucket, or final point for last bucket
+        if i < points-3:
+            nlo,nhi = edges[i+1],edges[i+2]
+            cx,cy = np.mean(x[nlo:nhi]),np.mean(y[nlo:nhi])
+        else:
+            cx,cy = x[-1],y[-1]
+        # Point forming largest triangle with previously selected point and next bucket average
+        area = np.abs((x[a]-cx)*(y[lo:hi]-y[a])-(x[a]-x[lo:hi])*(cy-y[a]))
+        a = lo+np.argmax(area)
+        selected[i+1] = a
+    return selected
+
+
+##### Point aggregation #####
+
+def bin_points(x,y,bins,extent,values=None,aggregate='count',chunk=4194304):
+    """
+    Aggregate scattered points onto a regular grid.
+
+    Points are accumulated in chunks so temporary memory is bounded by chunk size rather than number of points.
+    Empty cells are returned as nan.
+
+    :param bins: number of cells in x and y
+    :type bins: tuple
+    :param extent: grid bounds (xmin,xmax,ymin,ymax), points outside are ignored
+    :type extent: tuple
+    :param values: values at each point, required for mean and max
+    :type values: np.ndarray
+    :param aggregate: count, mean or max of values in each cell
+    :type aggregate: str
+    :param chunk: number of points accumulated at once
+    :type chunk: int
+    """
+
+    nx,ny = bins
+    x0,x1,y0,y1 = extent
+    cells = nx*ny
+    counts = np.zeros(cells)
+    if aggregate == 'mean':
+        totals = np.zeros(cells)
+    elif aggregate == 'max':
+        maxima = np.full(cells,-np.inf)
+    sx = nx/(x1-x0) if x1>x0 else 0.0
+    sy = ny/(y1-y0) if y1>y0 else 0.0
+    for start in range(0,x.size,chunk):
+        xc = x[start:start+chunk]
+        yc = y[start:start+chunk]
+        inside = (xc>=x0)&(xc<=x1)&(yc>=y0)&(yc<=y1)
+        # Points on upper bound fall into last cell
+        ix = np.minimum(((xc[inside]-x0)*sx).astype(np.int64),nx-1)
+        iy = np.minimum(((yc[inside]-y0)*sy).astype(np.int64),ny-1)
+        flat = iy*nx+ix
+        counts += np.bincount(flat,minlength=cells)
+        if aggregate == 'mean':
+            totals += np.bincount(flat,weights=values[start:start+chunk][inside],minlength=cells)
+        elif aggregate == 'max':
+            np.maximum.at(maxima,flat,values[start:start+chunk][inside])
+    empty = counts == 0
+    if aggregate == 'mean':
+        grid = totals/np.where(empty,1,counts)
+    elif aggregate == 'max':
+        grid = maxima
+    else:
+        grid = counts
+    grid[empty] = np.nan
+    return grid.reshape(ny,nx)
+
+
+##### Image pyramids #####
+
+def halve_grid(z,out,method='mean',chunk=4194304):
+    """
+    Reduce grid to half size in each direction, combining each 2x2 block of finite values by mean or max.
+
+    Rows are read in chunks so only part of z need be in memory, allowing z and out to be memory-mapped.
+    Blocks beyond odd edges of z, and blocks without finite values, are treated as missing (nan).
+
+    :param z: grid of values
+    :type z: np.ndarray
+    :param out: array of shape (ceil(ny/2),ceil(nx/2)) to hold reduced grid
+    :type out: np.ndarray
+    :param method: mean or max
+    :type method: str
+    :param chunk: approximate number of values read at once
+    :type chunk: int
+    """
+
+    ny,nx = z.shape
+    rows = max(2,(chunk//max(nx,1))//2*2) # Even number of rows per chunk
+    for start in range(0,ny,rows):
+        block = np.asarray(z[start:start+rows],dtype=out.dtype)
+        h,w = block.shape
+        if h%2 or w%2:
+            padded = np.full((h+h%2,w+w%2),np.nan,dtype=out.dtype)
+            padded[:h,:w] = block
+            block = padded
+        finite = np.isfinite(block)
+        shape = (block.shape[0]//2,2,block.shape[1]//2,2)
+        count = finite.reshape(shape).sum(axis=(1,3))
+        if method == 'max':
+            reduced = np.where(finite,block,-np.inf).reshape(shape).max(axis=(1,3))
+        else:
+            with np.errstate(invalid='ignore',divide='ignore'):
+                reduced = np.where(finite,block,0).reshape(shape).sum(axis=(1,3))/count
+        reduced[count==0] = np.nan
+        out[start//2:start//2+reduced.shape[0]] = reduced
+
+
+def grid_key(z,method,chunk=4194304):
+    """Hash of shape, type and values of grid and reduction method, reading rows in chunks so z can be memory-mapped."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('{} {} {}'.format(z.shape,z.dtype,method).encode())
+    rows = max(1,chunk//max(z.shape[-1],1))
+    for start in range(0,len(z),rows):
+        digest.update(np.ascontiguousarray(z[start:start+rows]).data)
+    return digest.hexdigest()
+
+
+def build_pyramid(z,method='mean',minimum=64,directory=None,chunk=4194304):
+    """
+    Levels of successively halved grids, starting with z itself, until a level is no larger than minimum in both directions.
+    Files written to directory are named by a hash of z and method, so data sets can share a directory.
+
+    :param z: full resolution grid, can be memory-mapped
+    :type z: np.ndarray
+    :param method: mean or max of each 2x2 block
+    :type method: str
+    :param minimum: size of smallest level
+    :type minimum: int
+    :param directory: write levels as memory-mapped .npy files in directory, rather than holding in memory
+    :type directory: str
+    :param chunk: approximate number of values read at once
+    :type chunk: int
+    """
+
+    dtype = np.result_type(z.dtype,np.float32)
+    key = grid_key(z,method,chunk=chunk) if directory is not None else None
+    levels = [z]
+    while max(levels[-1].shape) > minimum:
+        ny,nx = levels[-1].shape
+        shape = ((ny+1)//2,(nx+1)//2)
+        if directory is not None:
+            filename = os.path.join(directory,'pyramid_{}_level_{}.npy'.format(key,len(levels)))
+            out = np.lib.format.open_memmap(filename,mode='w+',dtype=dtype,shape=shape)
+        else:
+            out = np.empty(shape,dtype=dtype)
+        halve_grid(levels[-1],out,method=method,chunk=chunk)
+        levels.append(out)
+    return levels
+
+
+##### Statistics #####
+
+def column_statistics(values,order=True,chunk=1048576):
+    """
+    Minimum, maximum and number of finite values, and whether values never decrease.
+
+    Values are read once, in chunks small enough that the finite mask, extrema and ordering checks
+    are computed while each chunk is in cache.
+    Minimum and maximum are nan if there are no finite values.
+
+    :param values: values of one column or mesh
+    :type values: np.ndarray
+    :param order: check whether values never decrease, nan values count as out of order
+    :type order: bool
+    :param chunk: number of values read at once
+    :type chunk: int
+    """
+
+    lower = np.nan
+    upper = np.nan
+    finite = 0
+    monotonic = order
+    previous = None
+    # Chunks of whole rows, so meshes need not be contiguous
+    rows = max(1,chunk//max(math.prod(values.shape[1:]),1))
+    for start in range(0,len(values),rows):
+        block = np.asarray(values[start:start+rows]).reshape(-1)
+        mask = np.isfinite(block)
+        count = int(np.count_nonzero(mask))
+        if count == block.size:
+            lower = np.fmin(lower,block.min())
+            upper = np.fmax(upper,block.max())
+        elif count > 0:
+            lower = np.fmin(lower,block[mask].min())
+            upper = np.fmax(upper,block[mask].max())
+        finite += count
+        if monotonic:
+            monotonic = bool((block[1:]>=block[:-1]).all()) and (previous is None or bool(block[0]>=previous))
+            previous = block[-1]
+    return {'min':lower,'max':upper,'finite':finite,'monotonic':monotonic if order else None}
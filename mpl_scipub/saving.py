@@ -0,0 +1,209 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import matplotlib as mpl
+from .profiling import stage
+from .style import style_context
+
+
+# Formats drawn by Agg, which can be converted from one rendering
+raster_formats = ('png','jpg','jpeg','tif','tiff','webp')
+
+
+def output_formats(fmt,dpi):
+    """
+    List of (format,dpi) pairs from single format, or list of formats and (format,dpi) pairs.
+    Each format can be given once, as it is written to name.fmt.
+    """
+
+    if isinstance(fmt,str):
+        return [(fmt,dpi)]
+    formats = [(f,dpi) if isinstance(f,str) else (f[0],f[1]) for f in fmt]
+    names = [f for f,d in formats]
+    for f in names:
+        if names.count(f) > 1:
+            raise ValueError("Format {} given more than once, each format is written to a single file".format(f))
+    return formats
+
+
+def resolve_text(fig):
+    """
+    Create ticks and fix fonts of text now, as both are otherwise taken from rc parameters while drawing.
+    Returns whether any text is typeset by TeX, which reads its fonts from rc parameters when drawn.
+    """
+
+    from matplotlib.font_manager import findfont
+    from matplotlib.text import Text
+    for ax in fig.axes:
+        for axis in (ax.xaxis,ax.yaxis)+((ax.zaxis,) if hasattr(ax,'zaxis') else ()):
+            axis.get_major_ticks()
+            axis.get_minor_ticks()
+    usetex = False
+    files = {} # Font file for each family and style, as most text shares a few fonts
+    for text in fig.findobj(Text):
+        font = text.get_fontproperties()
+        key = (tuple(font.get_family()),font.get_style(),font.get_variant(),font.get_weight(),font.get_stretch())
+        if key not in files:
+            files[key] = findfont(font)
+        font.set_file(files[key])
+        usetex = usetex or text.get_usetex()
+    return usetex
+
+
+def tight_bbox(fig,dpi):
+    """Bounding box of figure contents in inches, padded as by savefig, found from a single layout pass at resolution."""
+
+    original = fig.dpi
+    try:
+        # Laid out at output resolution, as savefig does, since text extents depend on it
+        fig.dpi = dpi
+        renderer = fig.canvas.get_renderer()
+        with stage('layout',dpi=dpi):
+            # Lay out without rasterising, as savefig does for tight bounding box
+            with getattr(renderer,'_draw_disabled',nullcontext)():
+                fig.draw(renderer)
+            return fig.get_tightbbox(renderer).padded(mpl.rcParams['savefig.pad_inches'])
+    finally:
+        fig.dpi = original
+
+
+def write_rasters(fig,name,formats,dpi,bbox):
+    """Draw figure once at resolution and write each raster format, converting from a lossless rendering."""
+
+    if len(formats) == 1:
+        with stage('savefig',fmt=formats[0],dpi=dpi):
+            fig.savefig(name+"."+formats[0], dpi=dpi, bbox_inches=bbox)
+        return
+    from PIL import Image
+    buffer = io.BytesIO()
+    with stage('savefig',fmt='png',dpi=dpi):
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches=bbox)
+    for fmt in formats:
+        filename = name+"."+fmt
+        if fmt == 'png':
+            with open(filename,'wb') as f:
+                f.write(buffer.getbuffer())
+            continue
+        with stage('convert',fmt=fmt,dpi=dpi):
+            buffer.seek(0)
+            image = Image.open(buffer)
+            if fmt in ('jpg','jpeg'):
+                # No transparency in jpeg, so flatten onto white as savefig does
+                flat = Image.new('RGB',image.size,(255,255,255))
+                flat.paste(image,mask=image.getchannel('A'))
+                image = flat
+            image.save(filename,dpi=(dpi,dpi))
+
+
+def write_figure(fig,name,formats,dimensions,style=None):
+    """
+    Encode figure in each format and write to name.fmt, returning filenames.
+
+    In 2D the tight bounding box of several formats is found once for each resolution and shared,
+    and raster formats at the same resolution are converted from a single rendering.
+    The style is applied only while ticks are created and fonts found, unless text is typeset by TeX,
+    so figures of other plots can be made while this one is laid out and encoded.
+
+    :param formats: (format,dpi) pairs
+    :type formats: list
+    :param style: rc parameters of plot
+    :type style: dict
+    """
+
+    with style_context(style) if style is not None else nullcontext():
+        usetex = resolve_text(fig)
+    with style_context(style) if style is not None and usetex else nullcontext():
+        return write_formats(fig,name,formats,dimensions)
+
+
+def write_formats(fig,name,formats,dimensions):
+    """Write figure in each format with current rc parameters, returning filenames."""
+
+    bboxes = {dpi:None for fmt,dpi in formats} # 3D plots saved without tight bounding box to prevent cutoff
+    if dimensions == 2:
+        # Formats share one layout at each resolution, a single format is laid out by savefig
+        shared = len(formats) > 1 and hasattr(fig.canvas,'get_renderer')
+        for dpi in bboxes:
+            bboxes[dpi] = tight_bbox(fig,dpi) if shared else 'tight'
+    rasters = {}
+    for fmt,dpi in formats:
+        if fmt in raster_formats:
+            rasters.setdefault(dpi,[]).append(fmt)
+    filenames = []
+    for fmt,dpi in formats:
+        if fmt in raster_formats:
+            group = rasters.pop(dpi,None)
+            if group is not None:
+                write_rasters(fig,name,group,dpi,bboxes[dpi])
+        else:
+            with stage('savefig',fmt=fmt,dpi=dpi):
+                fig.savefig(name+"."+fmt, dpi=dpi, bbox_inches=bboxes[dpi])
+        filenames.append(name+"."+fmt)
+    return filenames
+
+
+def write_and_release(fig,ax,name,fmt,dpi,dimensions,pool,style):
+    """
+    Write figure detached from its plot, with text resolved in the plot's style, then return it to figure pool if it came from one.
+    Returns filename, or list of filenames if fmt is a list.
+    """
+
+    try:
+        filenames = write_figure(fig,name,output_formats(fmt,dpi),dimensions,style)
+        return filenames[0] if isinstance(fmt,str) else filenames
+    finally:
+        if pool is not None:
+            pool.release(fig,ax)
+
+
+class BackgroundSaver:
+    """
+    Writes figures on background threads.
+
+    Pending saves are limited, so when figures are produced faster than they are written
+    new saves wait for a free slot rather than holding ever more figures in memory.
+    """
+
+    def __init__(self,workers=1,queue=4):
+        """
+        :param workers: number of threads writing figures
+        :type workers: int
+        :param queue: number of saves allowed to wait for a thread
+        :type queue: int
+        """
+
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(workers+queue)
+        self.executor = None # Started on first save
+        self.lock = threading.Lock()
+
+
+    def submit(self,function,*args):
+        """Run function on background thread, blocking while queue is full, returning Future."""
+
+        self.slots.acquire()
+        try:
+            with self.lock:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.workers,thread_name_prefix='mpl_scipub_save')
+            future = self.executor.submit(function,*args)
+        except:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda f: self.slots.release())
+        return future
+
+
+    def shutdown(self,wait=True):
+        """Stop threads, by default after pending saves are written."""
+
+        with self.lock:
+            executor = self.executor
+            self.executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Shared saver used by default
+background_saver = BackgroundSaver()
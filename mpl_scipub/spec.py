@@ -0,0 +1,123 @@
+import json
+import os
+import numpy as np
+from .plotter import Plot
+from .dataset import DataSet, ColumnData
+from .loaders import read_text_columns, read_npz
+
+
+# Spec keys passed as keyword arguments to Plot setters, e.g. "axes" to Plot.set_axes
+plot_settings = ('plot_size','text','legend','axes','view')
+
+
+def read_spec(filename):
+    """
+    Read figure spec from JSON or TOML file.
+
+    A spec gives the output name and formats, Plot settings and a list of data sets, e.g.
+
+    {"output": "figures/sine", "format": ["pdf","png"], "dim": 2,
+     "axes": {"xlabel": "$t$", "xlim": [0,10]},
+     "datasets": [{"data": "sine.npy", "plot": "line", "label": "sine"}]}
+
+    Keys of each data set other than "data" are DataSet keyword arguments.
+    Paths are relative to the spec file.
+    """
+
+    if filename.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib # Before Python 3.11
+        with open(filename,'rb') as f:
+            return tomllib.load(f)
+    with open(filename) as f:
+        return json.load(f)
+
+
+def is_reference(value):
+    """Whether spec value refers to data in a file, as {"path": ...}."""
+
+    return isinstance(value,dict) and 'path' in value
+
+
+def data_references(spec):
+    """References to data files used by spec, skipping data given inline."""
+
+    references = []
+    for entry in spec.get('datasets',[]):
+        for key,value in entry.items():
+            if key == 'data':
+                values = value if isinstance(value,list) else [value]
+                references += [{'path':v} if isinstance(v,str) else v for v in values if isinstance(v,str) or is_reference(v)]
+            elif is_reference(value):
+                references.append(value)
+    return references
+
+
+def load_array(reference,directory):
+    """
+    Array from data file reference {"path": ..., "key": ..., "columns": [...], "delimiter": ..., "skiprows": ..., "dtype": ...}.
+    .npy files are memory-mapped, .npz files need key if holding several arrays, others are read as text
+    with the requested columns kept as separate arrays.
+    """
+
+    if isinstance(reference,str):
+        reference = {'path':reference}
+    path = os.path.join(directory,reference['path'])
+    columns = reference.get('columns',None)
+    if path.endswith('.npy') or path.endswith('.npz'):
+        if path.endswith('.npy'):
+            array = np.load(path,mmap_mode='r')
+        else:
+            array = read_npz(path,keys=[reference['key']] if 'key' in reference else None)[0]
+        return array[:,columns] if columns is not None else array
+    # Text files read in chunks, keeping only requested columns
+    single = isinstance(columns,int)
+    arrays = read_text_columns(path,columns=[columns] if single else columns,delimiter=reference.get('delimiter',','),
+                               skiprows=reference.get('skiprows',0),dtype=reference.get('dtype','float64'))
+    return arrays[0] if single else ColumnData(arrays)
+
+
+def build_plot(spec,directory='.'):
+    """Plot with data sets described by spec, with data paths relative to directory."""
+
+    plot = Plot(dim=spec.get('dim',2))
+    for setting in plot_settings:
+        if setting in spec:
+            getattr(plot,'set_'+setting)(**spec[setting])
+    for entry in spec.get('datasets',[]):
+        kwargs = {key:(load_array(value,directory) if is_reference(value) else value) for key,value in entry.items()
+                  if key != 'data'}
+        data = entry['data']
+        if isinstance(data,list) and all(isinstance(d,(str,dict)) for d in data):
+            data = [load_array(d,directory) for d in data] # Separate column or mesh files
+        elif isinstance(data,(str,dict)):
+            data = load_array(data,directory)
+        kwargs.setdefault('copy',None) # Use loaded arrays in place
+        plot.add_dataset(DataSet(data,**kwargs))
+    return plot
+
+
+def spec_output(spec,filename):
+    """Output name of spec, by default the spec filename without extension."""
+
+    directory = os.path.dirname(filename)
+    if 'output' in spec:
+        return os.path.join(directory,spec['output'])
+    return os.path.splitext(filename)[0]
+
+
+def render_spec(filename):
+    """Plot and save figure described by spec file, returning output filenames."""
+
+    spec = read_spec(filename)
+    plot = build_plot(spec,os.path.dirname(filename))
+    plot.set_figure_pool()
+    name = spec_output(spec,filename)
+    if os.path.dirname(name):
+        os.makedirs(os.path.dirname(name),exist_ok=True)
+    fmt = spec.get('format','pdf')
+    plot.save(name=name,fmt=fmt,dpi_quality=spec.get('dpi',None))
+    formats = [fmt] if isinstance(fmt,str) else fmt
+    return [name+"."+(f if isinstance(f,str) else f[0]) for f in formats]
@@ -0,0 +1,36 @@
+import functools
+import threading
+from contextlib import contextmanager
+import matplotlib as mpl
+
+
+# rcParams are global, so plots in different threads take turns to apply their style
+style_lock = threading.RLock()
+applied = threading.local()
+
+
+@contextmanager
+def style_context(style):
+    """Apply rc parameters of a plot to matplotlib for duration of context."""
+
+    # Style already applied by enclosing call in this thread
+    if getattr(applied,'depth',0) > 0:
+        yield
+        return
+    with style_lock:
+        applied.depth = 1
+        try:
+            with mpl.rc_context(style):
+                yield
+        finally:
+            applied.depth = 0
+
+
+def styled(method):
+    """Decorator running Plot method with the plot's style applied."""
+
+    @functools.wraps(method)
+    def wrapper(self,*args,**kwargs):
+        with style_context(self.style):
+            return method(self,*args,**kwargs)
+    return wrapper
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def point_key(x,y,chunk=1048576):
+    """Hash of x and y values, read in chunks so non-contiguous or float32 columns are not copied in full."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for values in (x,y):
+        values = np.asarray(values)
+        digest.update(str(values.shape).encode())
+        for start in range(0,values.size,chunk):
+            # Converted per chunk, so float32 points hash like float64 without a full copy
+            digest.update(np.ascontiguousarray(values[start:start+chunk],dtype=np.float64).data)
+    return digest.hexdigest()
+
+
+class TriangulationCache:
+    """
+    Delaunay triangulations of recently drawn points, keyed by hash of x and y values,
+    so surfaces and contours sharing points, or redrawn from other views, are triangulated once.
+    """
+
+    def __init__(self,size=8):
+        """
+        :param size: maximum number of triangulations kept in memory
+        :type size: int
+        """
+
+        self.size = size
+        self.triangulations = OrderedDict() # Least recently used first
+        self.lock = threading.Lock()
+
+
+    def get(self,x,y,key=None,directory=None):
+        """
+        Triangulation of points, from memory, from file in directory or computed and stored in both.
+
+        :param key: hash of x and y values, computed if not given
+        :type key: str
+        :param directory: directory to keep triangles as .npy files between runs
+        :type directory: str
+        """
+
+        import matplotlib.tri as tri
+        if key is None:
+            key = point_key(x,y)
+        filename = os.path.join(directory,'triangles_{}.npy'.format(key)) if directory is not None else None
+        with self.lock:
+            triangulation = self.triangulations.get(key)
+            if triangulation is not None:
+                self.triangulations.move_to_end(key)
+        if triangulation is not None:
+            if filename is not None and not os.path.exists(filename):
+                np.save(filename,triangulation.triangles)
+            return triangulation
+        if filename is not None and os.path.exists(filename):
+            triangulation = tri.Triangulation(x,y,triangles=np.load(filename))
+        else:
+            triangulation = tri.Triangulation(x,y)
+            if filename is not None:
+                np.save(filename,triangulation.triangles)
+        with self.lock:
+            self.triangulations[key] = triangulation
+            while len(self.triangulations) > self.size:
+                self.triangulations.popitem(last=False)
+        return triangulation
+
+
+    def clear(self):
+        """Remove all triangulations held in memory."""
+
+        with self.lock:
+            self.triangulations = OrderedDict()
+
+
+# Shared cache used by default
+triangulation_cache = TriangulationCache()
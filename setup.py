@@ -7,4 +7,5 @@ setup(name='mpl_scipub',
       author='dormrod',
       license='MIT',
       packages=['mpl_scipub'],
+      entry_points={'console_scripts':['mpl-scipub=mpl_scipub.cli:main']},
       zip_safe=False)
@@ -0,0 +1,15 @@
+import json
+import os
+from mpl_scipub.cli import main
+
+
+def test_render_inline_data(tmp_path):
+    """Spec with data given inline renders, then is skipped as up to date."""
+
+    spec = tmp_path/'inline.json'
+    spec.write_text(json.dumps({'format':'png','datasets':[{'data':[[0,1],[1,2],[2,0]],'plot':'line'}]}))
+    state = str(tmp_path/'state.json')
+    assert main(['render',str(spec),'-j','1','--state',state]) == 0
+    assert os.path.exists(tmp_path/'inline.png')
+    assert main(['render',str(spec),'-j','1','--state',state]) == 0
+    assert os.path.abspath(spec) in json.load(open(state))
@@ -0,0 +1,22 @@
+import numpy as np
+from mpl_scipub.reduction import minmax_indices, index_bins
+
+
+def test_minmax_keeps_extrema_and_breaks_with_nan():
+    """Bins containing nan keep their finite minimum and maximum, and the nan breaking the line."""
+
+    y = np.array([0,5,1,np.nan,2,3,-4,1,0,0.])
+    keep = minmax_indices(np.repeat([0,1],5),[y])
+    assert 5 in y[keep] and -4 in y[keep]
+    assert np.isnan(y[keep]).sum() == 1
+    # Line either side of the break reaches it
+    assert {2,3,4} <= set(keep)
+
+
+def test_minmax_all_nan_bins():
+    """Bins of only nan values keep the break without selecting other points."""
+
+    y = np.concatenate((np.arange(10.),np.full(10,np.nan),np.arange(10.)))
+    keep = minmax_indices(index_bins(y.size,3),[y])
+    assert np.isnan(y[keep]).any()
+    assert y[keep][0] == 0 and y[keep][-1] == 9